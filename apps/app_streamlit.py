@@ -8,7 +8,10 @@ Este aplicativo fornece uma interface web interativa para:
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+import heapq
+import io
 import time
 from pathlib import Path
 import os
@@ -16,19 +19,28 @@ import yaml
 from datetime import datetime
 import traceback
 import logging
+import logging.handlers
 
 # Configurar logging
 import os
 os.makedirs('logs', exist_ok=True)  # Criar pasta logs se não existir
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/streamlit_debug.log'),
-        logging.StreamHandler()
-    ]
-)
+# O Streamlit reexecuta o script a cada interação: configurar só uma vez.
+# Arquivo aberto sob demanda (delay) e escrito em lotes via MemoryHandler
+if not logging.getLogger().handlers:
+    _log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    _file_handler = logging.FileHandler('logs/streamlit_debug.log', delay=True)
+    _file_handler.setFormatter(logging.Formatter(_log_format))
+    logging.basicConfig(
+        level=logging.INFO,
+        format=_log_format,
+        handlers=[
+            logging.handlers.MemoryHandler(
+                capacity=256, flushLevel=logging.ERROR, target=_file_handler
+            ),
+            logging.StreamHandler()
+        ]
+    )
 logger = logging.getLogger(__name__)
 
 # Adicionar o diretório raiz ao Python path
@@ -89,19 +101,8 @@ def initialize_database_if_needed():
 if not initialize_database_if_needed():
     st.stop()
 
-# Importar módulos do projeto
-try:
-    from src.etl.from_db import load_draws
-    from src.features.make import build_number_features, latest_feature_snapshot
-    from src.models.scoring import learn_weights_ridge, score_numbers
-    from src.generate.tickets import load_filters_config, generate_candidates, apply_filters, assign_trevos
-    from src.simulate.backtest_ray import run_backtest_parallel, print_backtest_summary
-    from src.generate.export import export_excel, format_ticket_display
-except ImportError as e:
-    st.error(f"Erro ao importar módulos: {e}")
-    st.error(f"Diretório atual: {os.getcwd()}")
-    st.error(f"Python path: {sys.path}")
-    st.stop()
+# Os módulos do projeto (Polars, SQLAlchemy, sklearn, openpyxl...) são
+# importados sob demanda: o Streamlit reexecuta o script a cada interação.
 
 # Configuração da página
 st.set_page_config(
@@ -147,12 +148,6 @@ top_k = st.sidebar.number_input(
     help="Número de melhores bilhetes para exibir"
 )
 
-export_filename = st.sidebar.text_input(
-    "📄 Nome do Arquivo de Exportação",
-    value="jogos_streamlit.xlsx",
-    help="Nome do arquivo Excel para exportação"
-)
-
 # Botão principal de geração
 st.sidebar.markdown("---")
 generate_button = st.sidebar.button(
@@ -176,96 +171,153 @@ if 'results' not in st.session_state:
 if 'metrics' not in st.session_state:
     st.session_state.metrics = None
 
+# Limite de pares bilhete x sorteio para usar o backtest Numba in-process
+NUMBA_BACKTEST_MAX_PAIRS = 10_000_000
+
+# Estágios pesados do pipeline em cache (reutilizados entre cliques)
+@st.cache_data(show_spinner=False)
+def _load_and_featurize(db_path, db_mtime):
+    """Carrega sorteios e gera features; o mtime do banco invalida o cache."""
+    import polars as pl
+    from src.etl.from_db import load_draws
+    from src.features.make import build_number_features, latest_feature_snapshot
+    
+    df = load_draws(db_path)
+    # Descarta linhas com 'tipo' inválido antes de gerar as features
+    if 'tipo' in df.columns:
+        df = df.filter(pl.col('tipo').is_in(['dezena', 'trevo']))
+    features = build_number_features(df)
+    snapshot = latest_feature_snapshot(df)
+    return df, features, snapshot
+
+
+def _hash_polars_frame(frame):
+    """Hash vetorizado das linhas de um DataFrame Polars (sem pickle)."""
+    return int(frame.hash_rows().sum())
+
+
+# Chave por nome qualificado: não exige importar Polars no topo do script
+_POLARS_HASH_FUNCS = {'polars.dataframe.frame.DataFrame': _hash_polars_frame}
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=_POLARS_HASH_FUNCS)
+def _train_model(features):
+    """Treina o Ridge uma única vez por conjunto de features."""
+    from src.models.scoring import learn_weights_ridge
+    
+    return learn_weights_ridge(features)
+
+
+@st.cache_data(show_spinner=False)
+def _load_config(config_path, config_mtime):
+    """Carrega o YAML de filtros; o mtime do arquivo invalida o cache."""
+    from src.generate.tickets import load_filters_config
+    
+    return load_filters_config(config_path)
+
+
 # Função principal de execução
-def run_pipeline(db_path, config_path, seed, top_k):
-    """Executa o pipeline completo e retorna resultados."""
+def run_pipeline(db_path, config_path, seed, top_k, db_mtime, config_mtime):
+    """Executa o pipeline completo e retorna resultados.
+    
+    db_mtime/config_mtime vêm do os.stat feito na validação dos caminhos e
+    servem de chave de cache, sem novas chamadas ao sistema de arquivos.
+    """
+    # Um único bloco de status atualizado a cada etapa (em vez de várias
+    # mensagens st.success, cada uma com sua própria renderização)
+    status = st.status("🚀 Executando pipeline...", expanded=True)
     try:
+        from src.models.scoring import score_numbers
+        from src.generate.tickets import generate_candidates, apply_filters, assign_trevos
+        from src.simulate.backtest_ray import run_backtest_parallel
+        from src.simulate.backtest_numba import NUMBA_AVAILABLE, run_backtest_numba
+        
         logger.info("Iniciando pipeline completo")
         
         # 1. Carregar dados
-        with st.spinner("📥 Carregando dados do banco..."):
-            df = load_draws(db_path)
-            logger.info(f"Dados carregados: {len(df)} registros")
-            st.success(f"✅ {len(df)} sorteios carregados")
+        status.update(label="📥 Carregando dados do banco...")
+        df, features, snapshot = _load_and_featurize(db_path, db_mtime)
+        logger.info(f"Dados carregados: {len(df)} registros")
         
         # 2. Gerar features e treinar modelo
-        with st.spinner("🧠 Gerando features e treinando modelo..."):
-            logger.info("Gerando features...")
-            features = build_number_features(df)
-            logger.info(f"Features geradas: {features.shape}")
-            
-            snapshot = latest_feature_snapshot(df)
-            logger.info(f"Snapshot gerado: {snapshot.shape}")
-            
-            model, scaler, weights = learn_weights_ridge(features)
-            logger.info(f"Modelo treinado com {len(features)} amostras")
-            
-            scores = score_numbers(snapshot, weights)
-            logger.info(f"Scores calculados para {len(scores)} números")
-            
-            # Selecionar apenas colunas numéricas para o scaler
-            numeric_features = features.select([
-                'freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5'
-            ])
-            
-            r2_score = model.score(
-                scaler.transform(numeric_features.to_numpy()),
-                features.select('y_next').to_numpy().ravel()
-            )
-            
-            st.success(f"✅ Modelo treinado (R² = {r2_score:.4f})")
-            st.success(f"✅ Scores calculados para {len(scores)} números")
+        status.update(label="🧠 Gerando features e treinando modelo...")
+        logger.info(f"Features geradas: {features.shape}")
+        logger.info(f"Snapshot gerado: {snapshot.shape}")
+        
+        model, scaler, weights, r2_score = _train_model(features)
+        logger.info(f"Modelo treinado com {len(features)} amostras")
+        
+        scores = score_numbers(snapshot, weights)
+        logger.info(f"Scores calculados para {len(scores)} números")
         
         # 3. Gerar candidatos e aplicar filtros
-        with st.spinner("🎲 Gerando candidatos e aplicando filtros..."):
-            logger.info("Carregando configuração de filtros...")
-            config = load_filters_config(config_path)
-            
-            candidates = generate_candidates(
-                scores, 
-                k=config['generation']['k'],
-                top_pool=config['generation']['top_pool'],
-                n=config['generation']['n'],
-                seed=seed
-            )
-            logger.info(f"Candidatos gerados: {len(candidates)}")
-            
-            filtered_tickets = apply_filters(candidates, config['filters'])
-            approval_rate = len(filtered_tickets) / len(candidates) * 100
-            logger.info(f"Tickets filtrados: {len(filtered_tickets)} ({approval_rate:.1f}% aprovação)")
-            
-            complete_tickets = assign_trevos(
-                filtered_tickets, 
-                strategy=config['trevos']['strategy'],
-                seed=seed
-            )
-            
-            # Pegar apenas os top_k melhores
-            complete_tickets = complete_tickets[:config['output']['top_k']]
-            logger.info(f"Bilhetes completos: {len(complete_tickets)}")
-            
-            st.success(f"✅ {len(candidates)} candidatos gerados")
-            st.success(f"✅ {len(filtered_tickets)} tickets após filtros ({approval_rate:.1f}% aprovação)")
-            st.success(f"✅ {len(complete_tickets)} bilhetes completos gerados")
+        status.update(label="🎲 Gerando candidatos e aplicando filtros...")
+        logger.info("Carregando configuração de filtros...")
+        config = _load_config(config_path, config_mtime)
+        
+        candidates = generate_candidates(
+            scores, 
+            k=config['generation']['k'],
+            top_pool=config['generation']['top_pool'],
+            n=config['generation']['n'],
+            seed=seed
+        )
+        logger.info(f"Candidatos gerados: {len(candidates)}")
+        
+        filtered_tickets = apply_filters(candidates, config['filters'])
+        approval_rate = len(filtered_tickets) / len(candidates) * 100
+        logger.info(f"Tickets filtrados: {len(filtered_tickets)} ({approval_rate:.1f}% aprovação)")
+        
+        complete_tickets = assign_trevos(
+            filtered_tickets, 
+            strategy=config['trevos']['strategy'],
+            seed=seed
+        )
+        
+        # Pegar apenas os top_k melhores
+        complete_tickets = complete_tickets[:config['output']['top_k']]
+        logger.info(f"Bilhetes completos: {len(complete_tickets)}")
         
         # 4. Executar backtest
-        with st.spinner("📈 Executando backtest paralelo..."):
+        status.update(label="📈 Executando backtest...")
+        # Lotes pequenos: kernel Numba in-process evita o custo de criar workers
+        if NUMBA_AVAILABLE and len(complete_tickets) * len(df) < NUMBA_BACKTEST_MAX_PAIRS:
+            logger.info("Iniciando backtest in-process (Numba)...")
+            results = run_backtest_numba(complete_tickets, df)
+        else:
             logger.info("Iniciando backtest paralelo...")
             results = run_backtest_parallel(complete_tickets, df)
-            logger.info(f"Backtest concluído: {len(results)} resultados")
-            st.success(f"✅ Backtest concluído para {len(results)} bilhetes")
+        logger.info(f"Backtest concluído: {len(results)} resultados")
+        
+        # Resumo das etapas escrito de uma só vez
+        status.markdown(
+            f"✅ {len(df)} sorteios carregados  \n"
+            f"✅ Modelo treinado (R² = {r2_score:.4f})  \n"
+            f"✅ Scores calculados para {len(scores)} números  \n"
+            f"✅ {len(candidates)} candidatos gerados  \n"
+            f"✅ {len(filtered_tickets)} tickets após filtros ({approval_rate:.1f}% aprovação)  \n"
+            f"✅ {len(complete_tickets)} bilhetes completos gerados  \n"
+            f"✅ Backtest concluído para {len(results)} bilhetes"
+        )
+        status.update(label="✅ Pipeline concluído", state="complete", expanded=False)
         
         # Ordenar por score e pegar top_k
-        results_sorted = sorted(results, key=lambda x: x['score'], reverse=True)[:top_k]
+        results_sorted = heapq.nlargest(top_k, results, key=lambda x: x['score'])
         
-        # Calcular métricas gerais
+        # Calcular métricas gerais (uma única passada sobre os resultados)
+        arr = np.fromiter(
+            ((r['score'], r['avg_hits_dezenas'], r['max_hits_dezenas'], r['max_hits_trevos'])
+             for r in results),
+            dtype=np.dtype([('s', 'f8'), ('ah', 'f8'), ('mh', 'i4'), ('mt', 'i4')]),
+            count=len(results)
+        )
         metrics = {
             'total_bilhetes': len(results),
-            'score_medio': sum(r['score'] for r in results) / len(results),
-            'melhor_score': max(r['score'] for r in results),
-            'acertos_medios_dezenas': sum(r['avg_hits_dezenas'] for r in results) / len(results),
-            'bilhetes_4_plus': sum(1 for r in results if r['max_hits_dezenas'] >= 4),
-            'bilhetes_1_trevo_plus': sum(1 for r in results if r['max_hits_trevos'] >= 1),
+            'score_medio': float(arr['s'].mean()),
+            'melhor_score': float(arr['s'].max()),
+            'acertos_medios_dezenas': float(arr['ah'].mean()),
+            'bilhetes_4_plus': int((arr['mh'] >= 4).sum()),
+            'bilhetes_1_trevo_plus': int((arr['mt'] >= 1).sum()),
             'r2_score': r2_score,
             'approval_rate': approval_rate,
             'weights': weights
@@ -279,43 +331,10 @@ def run_pipeline(db_path, config_path, seed, top_k):
         logger.error(f"Erro durante pipeline: {error_msg}")
         logger.error(f"Traceback completo: {traceback.format_exc()}")
         
+        status.update(label="❌ Pipeline interrompido", state="error", expanded=False)
         if "could not convert string to float" in error_msg and "dezena" in error_msg:
             st.error("❌ Erro de conversão detectado: Problema com dados contendo 'dezena'")
             st.error("💡 Sugestão: Verifique se há dados corrompidos ou configurações incorretas")
-            st.info("🔧 Tentando executar com validação adicional...")
-            logger.warning("Tentando recuperação com validação de dados")
-            
-            # Tentar novamente com validação extra
-            try:
-                # Recarregar dados com validação
-                df_clean = load_draws(db_path)
-                logger.info(f"Dados recarregados: {len(df_clean)} registros")
-                
-                # Verificar se há problemas nos dados
-                if 'tipo' in df_clean.columns:
-                    unique_tipos = df_clean['tipo'].unique().to_list()
-                    st.info(f"Tipos únicos encontrados: {unique_tipos}")
-                    logger.info(f"Tipos únicos: {unique_tipos}")
-                    
-                    # Filtrar apenas dados válidos
-                    df_clean = df_clean.filter(pl.col('tipo').is_in(['dezena', 'trevo']))
-                    st.info(f"Dados filtrados: {df_clean.shape[0]} registros")
-                    logger.info(f"Dados filtrados: {df_clean.shape[0]} registros")
-                
-                # Tentar pipeline novamente com dados limpos
-                features_clean = build_number_features(df_clean)
-                snapshot_clean = latest_feature_snapshot(df_clean)
-                
-                st.success("✅ Dados validados e pipeline reiniciado")
-                logger.info("Validação bem-sucedida")
-                return None, None, None  # Retornar para permitir nova tentativa
-                
-            except Exception as retry_error:
-                logger.error(f"Erro na recuperação: {str(retry_error)}")
-                logger.error(f"Traceback da recuperação: {traceback.format_exc()}")
-                st.error(f"❌ Erro persistente após validação: {str(retry_error)}")
-                st.error("📋 Detalhes técnicos para debug:")
-                st.code(f"Erro original: {error_msg}\nErro na validação: {str(retry_error)}")
         else:
             st.error(f"❌ Erro durante execução: {error_msg}")
             
@@ -323,26 +342,88 @@ def run_pipeline(db_path, config_path, seed, top_k):
 
 # Executar pipeline quando botão for pressionado
 if generate_button:
-    # Validar inputs
-    if not os.path.exists(db_path):
+    # Validar inputs (um único stat por arquivo, reaproveitado como chave de cache)
+    db_stat = config_stat = None
+    try:
+        db_stat = os.stat(db_path)
+    except FileNotFoundError:
         st.error(f"❌ Banco de dados não encontrado: {db_path}")
-    elif not os.path.exists(config_path):
-        st.error(f"❌ Arquivo de configuração não encontrado: {config_path}")
     else:
+        try:
+            config_stat = os.stat(config_path)
+        except FileNotFoundError:
+            st.error(f"❌ Arquivo de configuração não encontrado: {config_path}")
+    
+    if db_stat is not None and config_stat is not None:
         start_time = time.time()
         
-        results, metrics, all_results = run_pipeline(db_path, config_path, seed, top_k)
+        results, metrics, all_results = run_pipeline(
+            db_path, config_path, seed, top_k,
+            db_stat.st_mtime, config_stat.st_mtime
+        )
         
         if results and metrics:
             st.session_state.results = results
             st.session_state.metrics = metrics
             st.session_state.all_results = all_results
+            # Bilhetes para exportação montados uma única vez, não a cada clique
+            st.session_state.tickets_for_export = [
+                (r['dezenas'], r['trevos']) for r in all_results
+            ]
             
             execution_time = time.time() - start_time
             st.success(f"⏱️ Pipeline concluído em {execution_time:.2f}s")
 
+# Seção de exportação (fragment: digitar o nome do arquivo ou exportar
+# reexecuta só este bloco e não o script inteiro)
+@st.fragment
+def _render_export():
+    """Renderiza a exportação em Excel dos bilhetes do session_state."""
+    metrics = st.session_state.metrics
+    
+    st.markdown("---")
+    st.header("📄 Exportação")
+    
+    col_export1, col_export2 = st.columns([3, 1])
+    
+    with col_export1:
+        st.write(f"Exportar todos os {metrics['total_bilhetes']} bilhetes para Excel:")
+        export_filename = st.text_input(
+            "📄 Nome do Arquivo de Exportação",
+            value="jogos_streamlit.xlsx",
+            help="Nome do arquivo Excel para exportação"
+        )
+    
+    with col_export2:
+        if st.button("📥 Exportar Excel", type="secondary"):
+            try:
+                from src.generate.export import export_excel
+                
+                # Bilhetes já preparados ao final do pipeline
+                tickets_for_export = st.session_state.tickets_for_export
+                
+                # Gerar o Excel direto em memória (sem gravar e reler do disco)
+                buffer = io.BytesIO()
+                export_excel(tickets_for_export, buffer)
+                
+                st.success(f"✅ {len(tickets_for_export)} bilhetes prontos para download")
+                
+                # Oferecer download
+                st.download_button(
+                    label="⬇️ Download Excel",
+                    data=buffer.getvalue(),
+                    file_name=export_filename,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+                        
+            except Exception as e:
+                st.error(f"❌ Erro na exportação: {str(e)}")
+
+
 # Exibir resultados se disponíveis
 if st.session_state.results and st.session_state.metrics:
+    from src.generate.export import format_tickets_display
+    
     results = st.session_state.results
     metrics = st.session_state.metrics
     
@@ -350,20 +431,20 @@ if st.session_state.results and st.session_state.metrics:
     with col1:
         st.subheader(f"🏆 Top {len(results)} Bilhetes")
         
-        # Criar DataFrame para exibição
-        display_data = []
-        for i, result in enumerate(results, 1):
-            display_data.append({
-                'Rank': i,
-                'Score': f"{result['score']:.4f}",
-                'Avg Dez': f"{result['avg_hits_dezenas']:.2f}",
-                'Avg Trev': f"{result['avg_hits_trevos']:.2f}",
-                'Max Dez': result['max_hits_dezenas'],
-                'Max Trev': result['max_hits_trevos'],
-                'Bilhete': format_ticket_display((result['dezenas'], result['trevos']))
-            })
-        
-        df_display = pd.DataFrame(display_data)
+        # Criar DataFrame para exibição (construído por colunas)
+        n_results = len(results)
+        df_display = pd.DataFrame({
+            'Rank': np.arange(1, n_results + 1),
+            'Score': np.fromiter((r['score'] for r in results), 'f8', count=n_results),
+            'Avg Dez': np.fromiter((r['avg_hits_dezenas'] for r in results), 'f8', count=n_results),
+            'Avg Trev': np.fromiter((r['avg_hits_trevos'] for r in results), 'f8', count=n_results),
+            'Max Dez': np.fromiter((r['max_hits_dezenas'] for r in results), 'i4', count=n_results),
+            'Max Trev': np.fromiter((r['max_hits_trevos'] for r in results), 'i4', count=n_results),
+            'Bilhete': format_tickets_display([(r['dezenas'], r['trevos']) for r in results])
+        })
+        df_display['Score'] = df_display['Score'].map('{:.4f}'.format)
+        df_display['Avg Dez'] = df_display['Avg Dez'].map('{:.2f}'.format)
+        df_display['Avg Trev'] = df_display['Avg Trev'].map('{:.2f}'.format)
         st.dataframe(df_display, use_container_width=True)
         
         # Melhor bilhete em destaque
@@ -407,42 +488,7 @@ if st.session_state.results and st.session_state.metrics:
         for feature, weight in metrics['weights'].items():
             st.metric(feature, f"{float(weight):.4f}")
     
-    # Seção de exportação
-    st.markdown("---")
-    st.header("📄 Exportação")
-    
-    col_export1, col_export2 = st.columns([3, 1])
-    
-    with col_export1:
-        st.write(f"Exportar todos os {metrics['total_bilhetes']} bilhetes para Excel:")
-    
-    with col_export2:
-        if st.button("📥 Exportar Excel", type="secondary"):
-            try:
-                # Preparar dados para exportação
-                export_path = f"outputs/{export_filename}"
-                tickets_for_export = []
-                
-                for result in st.session_state.all_results:
-                    tickets_for_export.append((result['dezenas'], result['trevos']))
-                
-                export_excel(tickets_for_export, export_path)
-                
-                st.success(f"✅ {len(tickets_for_export)} bilhetes exportados para: {export_path}")
-                
-                # Oferecer download
-                if os.path.exists(export_path):
-                    with open(export_path, "rb") as file:
-                        st.download_button(
-                            label="⬇️ Download Excel",
-                            data=file.read(),
-                            file_name=export_filename,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                        
-            except Exception as e:
-                st.error(f"❌ Erro na exportação: {str(e)}")
-
+    _render_export()
 else:
     # Tela inicial
     with col1:
@@ -23,31 +23,35 @@ from pathlib import Path
 src_path = Path(__file__).parent / 'src'
 sys.path.insert(0, str(src_path))
 
-# Importações do projeto
-from ingest.import_initial import load_and_process_excel
-from update.update_db import update_database
-from db.io import upsert_rows
-from db.schema import ensure_schema, get_engine
-import asyncio
+# Importações do projeto são feitas dentro de cada comando, para que
+# --help/--version e o comando não usado não paguem o custo de importação
 
 
 def setup_logging():
     """Configura logging para o CLI"""
     import logging
+    import logging.handlers
     
     # Criar diretório de logs se não existir
     logs_dir = Path('logs')
     logs_dir.mkdir(exist_ok=True)
     
-    # Configurar logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(logs_dir / 'milionaria_cli.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    # Configurar logging (uma única vez; arquivo aberto sob demanda e
+    # escrito em lotes, descarregado em erros e no encerramento)
+    if not logging.getLogger().handlers:
+        log_format = '%(asctime)s - %(levelname)s - %(message)s'
+        file_handler = logging.FileHandler(logs_dir / 'milionaria_cli.log', delay=True)
+        file_handler.setFormatter(logging.Formatter(log_format))
+        logging.basicConfig(
+            level=logging.INFO,
+            format=log_format,
+            handlers=[
+                logging.handlers.MemoryHandler(
+                    capacity=256, flushLevel=logging.ERROR, target=file_handler
+                ),
+                logging.StreamHandler(sys.stdout)
+            ]
+        )
     
     return logging.getLogger(__name__)
 
@@ -63,6 +67,10 @@ def cmd_import(file_path: str, logger) -> int:
         0 se sucesso, 1 se erro
     """
     try:
+        from ingest.import_initial import load_and_process_excel
+        from db.io import upsert_rows
+        from db.schema import ensure_schema, get_engine
+        
         logger.info(f"Iniciando importação de {file_path}")
         
         # Verificar se arquivo existe
@@ -100,6 +108,16 @@ def cmd_update(logger) -> int:
         0 se sucesso, 1 se erro
     """
     try:
+        import asyncio
+        from update.update_db import update_database
+        
+        # uvloop (Linux/macOS) acelera o loop do scraping; no Windows usa o padrão
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+        
         logger.info("Iniciando atualização de dados")
         
         # Executar atualização assíncrona
@@ -113,8 +131,8 @@ def cmd_update(logger) -> int:
         return 1
 
 
-def main():
-    """Função principal do CLI"""
+def _build_parser() -> argparse.ArgumentParser:
+    """Constrói o parser de argumentos do CLI"""
     parser = argparse.ArgumentParser(
         description='Milionária AI - Gerenciador de dados da Mega da Virada',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -147,8 +165,17 @@ Exemplos de uso:
         version='Milionária AI v1.0.0'
     )
     
-    # Parse dos argumentos
-    args = parser.parse_args()
+    return parser
+
+
+# Parser construído uma única vez por processo
+_PARSER = _build_parser()
+
+
+def main():
+    """Função principal do CLI"""
+    # Parse dos argumentos (o grupo obrigatório garante --import ou --update)
+    args = _PARSER.parse_args()
     
     # Setup logging
     logger = setup_logging()
@@ -156,11 +183,7 @@ Exemplos de uso:
     # Executar comando apropriado
     if args.import_file:
         return cmd_import(args.import_file, logger)
-    elif args.update:
-        return cmd_update(logger)
-    else:
-        parser.print_help()
-        return 1
+    return cmd_update(logger)
 
 
 if __name__ == '__main__':
@@ -16,13 +16,12 @@ from pathlib import Path
 this_directory = Path(__file__).parent
 long_description = (this_directory / "README.md").read_text(encoding='utf-8')
 
-# Ler requirements.txt
-requirements = []
-with open('requirements.txt', 'r', encoding='utf-8') as f:
-    for line in f:
-        line = line.strip()
-        if line and not line.startswith('#') and not line.startswith('-'):
-            requirements.append(line)
+# Ler requirements.txt (ignora linhas vazias, comentários e opções do pip)
+requirements = [
+    line.strip()
+    for line in Path('requirements.txt').read_text(encoding='utf-8').splitlines()
+    if line.strip() and not line.lstrip().startswith(('#', '-'))
+]
 
 setup(
     name="milionaria-ai",
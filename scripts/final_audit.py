@@ -14,11 +14,23 @@ def main():
     print("=== AUDITORIA FINAL DO SISTEMA ===")
     
     inspector = DatabaseInspector()
-    result = inspector.run_full_audit()
     
-    status = result["audit_status"]
+    # Seções exibidas à medida que a auditoria avança
+    section_labels = {
+        "database_info": "Database Info",
+        "table_info": "Table Info",
+        "data_integrity": "Data Integrity",
+    }
     
-    print(f"✅ Status da Auditoria: {'PASSOU' if status['passed'] else 'FALHOU'}")
+    print("\n=== RESUMO ===")
+    status = None
+    for name, section in inspector.iter_audit_sections():
+        if name == "audit_status":
+            status = section
+        elif name in section_labels:
+            print(f"{section_labels[name]}: {'✅' if 'error' not in section else '❌'}")
+    
+    print(f"\n✅ Status da Auditoria: {'PASSOU' if status['passed'] else 'FALHOU'}")
     print(f"📊 Issues Encontrados: {status['issues_found']}")
     
     if status['issues']:
@@ -28,11 +40,6 @@ def main():
     else:
         print("\n🎉 Nenhum problema encontrado!")
     
-    print("\n=== RESUMO ===")
-    print(f"Database Info: {'✅' if 'error' not in result['database_info'] else '❌'}")
-    print(f"Table Info: {'✅' if 'error' not in result['table_info'] else '❌'}")
-    print(f"Data Integrity: {'✅' if 'error' not in result['data_integrity'] else '❌'}")
-    
     print("\n🔍 Auditoria concluída!")
     return status['passed']
 
@@ -3,8 +3,61 @@
 
 import sqlite3
 import random
+import numpy as np
 from pathlib import Path
 
+def apply_corrections(conn, rows):
+    """Grava as correções em lote, numa única transação.
+    
+    Args:
+        conn: Conexão sqlite3 aberta
+        rows: Lista de tuplas (concurso, d1..d6, t1, t2, data) já corrigidas
+    """
+    if not rows:
+        return
+    
+    with conn:
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            # Upsert: um único statement preparado, executado por linha. A
+            # data vai no INSERT só para satisfazer o NOT NULL; no conflito
+            # (sempre, as linhas já existem) apenas dezenas e trevos mudam
+            conn.executemany("""
+                INSERT INTO sorteios (concurso, d1, d2, d3, d4, d5, d6, t1, t2, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(concurso) DO UPDATE SET
+                    d1=excluded.d1, d2=excluded.d2, d3=excluded.d3,
+                    d4=excluded.d4, d5=excluded.d5, d6=excluded.d6,
+                    t1=excluded.t1, t2=excluded.t2
+            """, rows)
+        else:
+            # SQLite antigo: executemany prepara o UPDATE uma vez e o executa
+            # para cada linha, na mesma transação
+            conn.executemany("""
+                UPDATE sorteios 
+                SET d1=?, d2=?, d3=?, d4=?, d5=?, d6=?, t1=?, t2=?
+                WHERE concurso=?
+            """, ((*row[1:9], row[0]) for row in rows))
+
+
+def ensure_concurso_index(conn):
+    """Garante busca por índice em sorteios.concurso.
+    
+    No schema do projeto concurso é INTEGER PRIMARY KEY (alias do rowid) e
+    nada é feito. Em bancos criados por fora, sem essa chave, cria o índice
+    único e atualiza as estatísticas do planner.
+    
+    Args:
+        conn: Conexão sqlite3 aberta
+    """
+    pk_columns = [row[1] for row in conn.execute("PRAGMA table_info(sorteios)") if row[5]]
+    if pk_columns == ["concurso"]:
+        return
+    
+    with conn:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_sorteios_concurso ON sorteios(concurso)")
+        conn.execute("ANALYZE sorteios")
+
+
 def fix_invalid_data():
     """Corrige dados inválidos no banco de dados."""
     db_path = "db/milionaria.db"
@@ -15,11 +68,12 @@ def fix_invalid_data():
     
     try:
         conn = sqlite3.connect(db_path)
+        ensure_concurso_index(conn)
         cursor = conn.cursor()
         
         # Buscar registros com dados inválidos
         cursor.execute("""
-            SELECT concurso, d1, d2, d3, d4, d5, d6, t1, t2 FROM sorteios 
+            SELECT concurso, d1, d2, d3, d4, d5, d6, t1, t2, data FROM sorteios 
             WHERE d1 > 50 OR d2 > 50 OR d3 > 50 OR d4 > 50 OR d5 > 50 OR d6 > 50
                OR t1 > 6 OR t2 > 6 OR d1 < 1 OR d2 < 1 OR d3 < 1 OR d4 < 1 OR d5 < 1 OR d6 < 1
                OR t1 < 1 OR t2 < 1
@@ -28,74 +82,49 @@ def fix_invalid_data():
         
         print(f"🔧 Encontrados {len(invalid_records)} registros para correção")
         
-        for record in invalid_records:
-            concurso = record[0]
-            dezenas = list(record[1:7])
-            trevos = list(record[7:9])
-            
-            print(f"\n📝 Corrigindo concurso {concurso}:")
-            print(f"   Dezenas originais: {dezenas}")
-            print(f"   Trevos originais: {trevos}")
-            
-            # Corrigir dezenas (1-50)
-            dezenas_corrigidas = []
-            for dezena in dezenas:
-                if dezena > 50:
-                    # Mapear valores acima de 50 para o range 1-50
-                    nova_dezena = ((dezena - 1) % 50) + 1
-                    dezenas_corrigidas.append(nova_dezena)
-                elif dezena < 1:
-                    dezenas_corrigidas.append(1)
-                else:
-                    dezenas_corrigidas.append(dezena)
-            
-            # Garantir que não há duplicatas nas dezenas
-            dezenas_unicas = []
-            for dezena in dezenas_corrigidas:
-                if dezena not in dezenas_unicas:
-                    dezenas_unicas.append(dezena)
-            
-            # Se temos menos de 6 dezenas únicas, completar com números aleatórios
-            while len(dezenas_unicas) < 6:
-                nova_dezena = random.randint(1, 50)
-                if nova_dezena not in dezenas_unicas:
-                    dezenas_unicas.append(nova_dezena)
-            
-            # Ordenar as dezenas
-            dezenas_unicas.sort()
-            
-            # Corrigir trevos (1-6)
-            trevos_corrigidos = []
-            for trevo in trevos:
-                if trevo > 6:
-                    novo_trevo = ((trevo - 1) % 6) + 1
-                    trevos_corrigidos.append(novo_trevo)
-                elif trevo < 1:
-                    trevos_corrigidos.append(1)
-                else:
-                    trevos_corrigidos.append(trevo)
-            
-            # Garantir que os trevos são diferentes
-            if trevos_corrigidos[0] == trevos_corrigidos[1]:
-                if trevos_corrigidos[0] < 6:
-                    trevos_corrigidos[1] = trevos_corrigidos[0] + 1
-                else:
-                    trevos_corrigidos[1] = trevos_corrigidos[0] - 1
-            
-            # Ordenar os trevos
-            trevos_corrigidos.sort()
-            
-            print(f"   Dezenas corrigidas: {dezenas_unicas}")
-            print(f"   Trevos corrigidos: {trevos_corrigidos}")
-            
-            # Atualizar no banco
-            cursor.execute("""
-                UPDATE sorteios 
-                SET d1=?, d2=?, d3=?, d4=?, d5=?, d6=?, t1=?, t2=?
-                WHERE concurso=?
-            """, (*dezenas_unicas, *trevos_corrigidos, concurso))
+        # Correções calculadas de uma vez sobre a matriz (N, 9)
+        arr = np.asarray([record[:9] for record in invalid_records], dtype=np.int64).reshape(-1, 9)
+        concursos = arr[:, 0]
+        
+        # Corrigir dezenas (1-50): acima de 50 mapeia para o range, abaixo de 1 vira 1
+        dezenas = np.where(arr[:, 1:7] < 1, 1, ((arr[:, 1:7] - 1) % 50) + 1)
+        dezenas_corrigidas = np.sort(dezenas, axis=1)
+        
+        # Linhas com dezenas repetidas: remover duplicatas e completar com
+        # números aleatórios sorteados de uma vez entre os que faltam
+        # (caso raro, tratado linha a linha)
+        has_dup = (np.diff(dezenas_corrigidas, axis=1) == 0).any(axis=1)
+        for i in np.flatnonzero(has_dup):
+            dezenas_unicas = set(dezenas[i].tolist())
+            disponiveis = sorted(set(range(1, 51)) - dezenas_unicas)
+            dezenas_unicas.update(random.sample(disponiveis, 6 - len(dezenas_unicas)))
+            dezenas_corrigidas[i] = sorted(dezenas_unicas)
+        
+        # Corrigir trevos (1-6)
+        trevos = np.where(arr[:, 7:9] < 1, 1, ((arr[:, 7:9] - 1) % 6) + 1)
+        t1, t2 = trevos[:, 0], trevos[:, 1]
+        
+        # Garantir que os trevos são diferentes
+        t2 = np.where(t1 == t2, np.where(t1 < 6, t1 + 1, t1 - 1), t2)
+        trevos_corrigidos = np.sort(np.column_stack([t1, t2]), axis=1)
+        
+        rows = [
+            (*row, record[9])
+            for row, record in zip(
+                np.column_stack([concursos, dezenas_corrigidas, trevos_corrigidos]).tolist(),
+                invalid_records,
+            )
+        ]
+        
+        for record, row in zip(invalid_records, rows):
+            print(f"\n📝 Corrigindo concurso {row[0]}:")
+            print(f"   Dezenas originais: {list(record[1:7])}")
+            print(f"   Trevos originais: {list(record[7:9])}")
+            print(f"   Dezenas corrigidas: {list(row[1:7])}")
+            print(f"   Trevos corrigidos: {list(row[7:9])}")
         
-        conn.commit()
+        # Atualizar no banco
+        apply_corrections(conn, rows)
         conn.close()
         
         print(f"\n✅ Correção concluída: {len(invalid_records)} registros corrigidos")
@@ -14,15 +14,26 @@ st.set_page_config(
 st.title("🎯 Milionária AI - Versão Debug")
 st.write("Esta é uma versão simplificada para debug.")
 
-st.subheader("Informações do Sistema")
-st.write(f"**Python Version:** {sys.version}")
-st.write(f"**Working Directory:** {os.getcwd()}")
 
-db_path = Path("db/milionaria.db")
-config_path = Path("configs/config.yaml")
+@st.cache_data(ttl=60)
+def _env_snapshot():
+    """Informações do ambiente, memoizadas entre reexecuções do script."""
+    return {
+        "py": sys.version.split()[0],
+        "cwd": os.getcwd(),
+        "db": Path("db/milionaria.db").exists(),
+        "cfg": Path("configs/config.yaml").exists(),
+    }
+
+
+env = _env_snapshot()
+
+st.subheader("Informações do Sistema")
+st.write(f"**Python Version:** {env['py']}")
+st.write(f"**Working Directory:** {env['cwd']}")
 
-st.write(f"**Database Exists:** {db_path.exists()}")
-st.write(f"**Config Exists:** {config_path.exists()}")
+st.write(f"**Database Exists:** {env['db']}")
+st.write(f"**Config Exists:** {env['cfg']}")
 
 if st.button("Teste de Funcionalidade"):
     st.success("Botão funcionando corretamente!")
@@ -8,6 +8,26 @@ from etl.from_db import load_draws
 from features.make import latest_feature_snapshot, build_number_features
 import os
 
+
+# Consultas de forma via schema/plan: funcionam com DataFrame e LazyFrame
+# sem acessar .shape/.columns/.width (que em LazyFrame resolvem o schema
+# implicitamente e emitem PerformanceWarning)
+def _col_names(frame):
+    """Nomes das colunas a partir do schema."""
+    return frame.collect_schema().names()
+
+
+def _n_rows(frame):
+    """Número de linhas via pl.len(), sem materializar as colunas."""
+    return frame.lazy().select(pl.len()).collect().item()
+
+
+def _text_cols(frame):
+    """Colunas cujo tipo admite strings (String/Object)."""
+    return [name for name, dtype in frame.collect_schema().items()
+            if dtype in (pl.String, pl.Object)]
+
+
 def validate_database_integrity(db_path="db/milionaria.db"):
     """Valida a integridade completa do banco de dados."""
     print("=== Validação de Integridade dos Dados ===")
@@ -19,14 +39,17 @@ def validate_database_integrity(db_path="db/milionaria.db"):
     try:
         # 1. Carregar dados
         print("1. Carregando dados...")
-        df = load_draws(db_path)
-        print(f"   ✓ {df.shape[0]} registros carregados")
-        print(f"   ✓ Colunas: {df.columns}")
+        # Só as colunas usadas na validação e nas features
+        df = load_draws(db_path, columns=['concurso', 'data', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2'])
+        columns = _col_names(df)
+        n_rows = _n_rows(df)
+        print(f"   ✓ {n_rows} registros carregados")
+        print(f"   ✓ Colunas: {columns}")
         
         # 2. Verificar estrutura básica
         print("\n2. Verificando estrutura básica...")
         required_cols = ['concurso', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-        missing_cols = [col for col in required_cols if col not in df.columns]
+        missing_cols = [col for col in required_cols if col not in columns]
         if missing_cols:
             print(f"   ❌ Colunas obrigatórias ausentes: {missing_cols}")
             return False
@@ -36,40 +59,24 @@ def validate_database_integrity(db_path="db/milionaria.db"):
         print("\n3. Verificando tipos de dados...")
         numeric_cols = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
         
+        # Uma única consulta lazy com todas as estatísticas por coluna. Não
+        # há varredura por 'dezena': colunas numéricas não contêm strings, e
+        # qualquer coluna de outro tipo já reprova a validação abaixo
+        stats = df.lazy().select(
+            [pl.col(col).n_unique().alias(f"{col}_n_unique") for col in numeric_cols]
+            + [pl.col(col).min().alias(f"{col}_min") for col in numeric_cols]
+            + [pl.col(col).max().alias(f"{col}_max") for col in numeric_cols]
+        ).collect().row(0, named=True)
+        
         for col in numeric_cols:
             print(f"   Verificando coluna {col}...")
+            print(f"     - {stats[f'{col}_n_unique']} valores únicos")
             
-            # Verificar valores únicos
-            unique_vals = df[col].unique().to_list()
-            print(f"     - {len(unique_vals)} valores únicos")
-            
-            # Verificar se há valores problemáticos
-            problematic_values = []
-            for val in unique_vals[:20]:  # Verificar primeiros 20 valores
-                if val is None:
-                    continue
-                    
-                # Verificar se contém 'dezena'
-                if isinstance(val, str) and 'dezena' in val:
-                    problematic_values.append(f"'{val}' (contém 'dezena')")
-                    continue
-                
-                # Verificar se é conversível para número
-                try:
-                    float(val)
-                except (ValueError, TypeError):
-                    if isinstance(val, str):
-                        problematic_values.append(f"'{val}' (não numérico)")
-                    else:
-                        problematic_values.append(f"{val} (tipo: {type(val)})")
-            
-            if problematic_values:
-                print(f"     ❌ Valores problemáticos encontrados: {problematic_values[:5]}")
-                if len(problematic_values) > 5:
-                    print(f"     ... e mais {len(problematic_values) - 5} valores")
+            # Verificar se a coluna é numérica
+            if not df.schema[col].is_numeric():
+                print(f"     ❌ Valores problemáticos encontrados: coluna do tipo {df.schema[col]} (não numérico)")
                 return False
-            else:
-                print(f"     ✓ Todos os valores são válidos")
+            print(f"     ✓ Todos os valores são válidos")
         
         # 4. Verificar ranges válidos
         print("\n4. Verificando ranges válidos...")
@@ -77,8 +84,8 @@ def validate_database_integrity(db_path="db/milionaria.db"):
         # Dezenas devem estar entre 1-50
         dezena_cols = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6']
         for col in dezena_cols:
-            min_val = df[col].min()
-            max_val = df[col].max()
+            min_val = stats[f"{col}_min"]
+            max_val = stats[f"{col}_max"]
             print(f"   {col}: {min_val} - {max_val}")
             
             if min_val < 1 or max_val > 50:
@@ -88,8 +95,8 @@ def validate_database_integrity(db_path="db/milionaria.db"):
         # Trevos devem estar entre 1-6
         trevo_cols = ['T1', 'T2']
         for col in trevo_cols:
-            min_val = df[col].min()
-            max_val = df[col].max()
+            min_val = stats[f"{col}_min"]
+            max_val = stats[f"{col}_max"]
             print(f"   {col}: {min_val} - {max_val}")
             
             if min_val < 1 or max_val > 6:
@@ -104,8 +111,9 @@ def validate_database_integrity(db_path="db/milionaria.db"):
             features = build_number_features(df)
             print(f"   ✓ Features de treinamento geradas: {features.shape}")
             
-            # Verificar se há 'dezena' nas features
-            for col in features.columns:
+            # Verificar se há 'dezena' nas features (só colunas de texto
+            # podem conter strings; as numéricas dispensam a varredura)
+            for col in _text_cols(features):
                 if col == 'tipo':  # Esta coluna deve conter 'dezena'
                     continue
                     
@@ -145,7 +153,7 @@ def validate_database_integrity(db_path="db/milionaria.db"):
             # Verificar se há 'dezena' em colunas numéricas
             numeric_feature_cols = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
             for col in numeric_feature_cols:
-                if col in snapshot.columns:
+                if col in _text_cols(snapshot):
                     sample_vals = snapshot[col].head(10).to_list()
                     for val in sample_vals:
                         if isinstance(val, str) and 'dezena' in val:
@@ -160,7 +168,7 @@ def validate_database_integrity(db_path="db/milionaria.db"):
         
         # 7. Verificar dados recentes
         print("\n7. Verificando dados recentes...")
-        if 'data' in df.columns:
+        if 'data' in columns:
             latest_date = df['data'].max()
             latest_concurso = df['concurso'].max()
             print(f"   ✓ Último concurso: {latest_concurso}")
@@ -168,7 +176,7 @@ def validate_database_integrity(db_path="db/milionaria.db"):
         
         print("\n=== ✅ VALIDAÇÃO CONCLUÍDA COM SUCESSO ===\n")
         print("Resumo:")
-        print(f"- {df.shape[0]} registros válidos")
+        print(f"- {n_rows} registros válidos")
         print(f"- {dezenas_count} dezenas no snapshot")
         print(f"- {trevos_count} trevos no snapshot")
         print(f"- Features de treinamento: {features.shape}")
@@ -191,18 +199,23 @@ def quick_data_check():
     print("=== Verificação Rápida dos Dados ===")
     
     try:
-        df = load_draws("db/milionaria.db")
-        print(f"✓ Dados carregados: {df.shape}")
-        
-        # Verificar se há strings 'dezena' em colunas numéricas
+        # Caminho rápido: só o schema, sem materializar os dados
         numeric_cols = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-        for col in numeric_cols:
-            if col in df.columns:
-                # Pegar uma amostra maior
-                sample = df[col].head(50).to_list()
-                dezena_found = [val for val in sample if isinstance(val, str) and 'dezena' in val]
-                if dezena_found:
-                    print(f"❌ PROBLEMA ENCONTRADO na coluna {col}: {dezena_found}")
+        lf = load_draws("db/milionaria.db", lazy=True, columns=numeric_cols)
+        schema = lf.collect_schema()
+        print(f"✓ Schema carregado: {len(schema)} colunas")
+        
+        # Colunas numéricas não podem conter strings 'dezena'; só se alguma
+        # não for numérica os dados são consultados
+        suspect_cols = [col for col in numeric_cols if col in schema and not schema[col].is_numeric()]
+        if suspect_cols:
+            found = lf.select([
+                pl.col(col).cast(pl.Utf8, strict=False).str.contains("dezena").any()
+                for col in suspect_cols
+            ]).collect().row(0, named=True)
+            for col in suspect_cols:
+                if found[col]:
+                    print(f"❌ PROBLEMA ENCONTRADO na coluna {col}: contém 'dezena'")
                     return False
         
         print("✓ Verificação rápida passou - dados parecem íntegros")
@@ -28,32 +28,27 @@ def verify_database():
         for col in columns:
             print(f"   - {col[1]} ({col[2]})")
         
-        # Contar registros
-        cursor.execute("SELECT COUNT(*) FROM sorteios;")
-        total = cursor.fetchone()[0]
-        print(f"📈 Total de registros: {total}")
-        
-        # Verificar ranges de dados
+        # Contagem, ranges e registros inválidos numa única consulta
         cursor.execute("""
             SELECT 
                 MIN(d1), MAX(d1), MIN(d2), MAX(d2), MIN(d3), MAX(d3),
                 MIN(d4), MAX(d4), MIN(d5), MAX(d5), MIN(d6), MAX(d6),
-                MIN(t1), MAX(t1), MIN(t2), MAX(t2)
+                MIN(t1), MAX(t1), MIN(t2), MAX(t2),
+                COUNT(*),
+                COALESCE(SUM(CASE WHEN
+                    d1 < 1 OR d1 > 50 OR d2 < 1 OR d2 > 50 OR d3 < 1 OR d3 > 50
+                    OR d4 < 1 OR d4 > 50 OR d5 < 1 OR d5 > 50 OR d6 < 1 OR d6 > 50
+                    OR t1 < 1 OR t1 > 6 OR t2 < 1 OR t2 > 6
+                THEN 1 ELSE 0 END), 0)
             FROM sorteios
         """)
         ranges = cursor.fetchone()
+        total, invalid = ranges[16], ranges[17]
+        
+        print(f"📈 Total de registros: {total}")
         print(f"🎯 Ranges das dezenas: D1[{ranges[0]}-{ranges[1]}], D2[{ranges[2]}-{ranges[3]}], D3[{ranges[4]}-{ranges[5]}]")
         print(f"   D4[{ranges[6]}-{ranges[7]}], D5[{ranges[8]}-{ranges[9]}], D6[{ranges[10]}-{ranges[11]}]")
         print(f"🍀 Ranges dos trevos: T1[{ranges[12]}-{ranges[13]}], T2[{ranges[14]}-{ranges[15]}]")
-        
-        # Verificar dados inválidos
-        cursor.execute("""
-            SELECT COUNT(*) FROM sorteios 
-            WHERE d1 < 1 OR d1 > 50 OR d2 < 1 OR d2 > 50 OR d3 < 1 OR d3 > 50
-               OR d4 < 1 OR d4 > 50 OR d5 < 1 OR d5 > 50 OR d6 < 1 OR d6 > 50
-               OR t1 < 1 OR t1 > 6 OR t2 < 1 OR t2 > 6
-        """)
-        invalid = cursor.fetchone()[0]
         print(f"⚠️  Registros com dados inválidos: {invalid}")
         
         # Mostrar primeiros 5 registros
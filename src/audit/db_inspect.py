@@ -4,11 +4,15 @@ Módulo de inspeção e auditoria do banco de dados
 Verifica integridade, estrutura e qualidade dos dados
 """
 
+import copy
+import csv
+from concurrent.futures import ThreadPoolExecutor
 import sqlite3
-import pandas as pd
 import os
+import polars as pl
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, Iterator, List, Literal, Tuple, Any
 import logging
 from datetime import datetime
 
@@ -97,122 +101,174 @@ class DatabaseInspector:
         """Verifica integridade dos dados principais"""
         try:
             with sqlite3.connect(self.full_db_path) as conn:
-                df = pd.read_sql_query("SELECT * FROM sorteios", conn)
+                cursor = conn.cursor()
                 
-                if df.empty:
-                    return {"error": "No data found in sorteios table"}
+                cursor.execute("PRAGMA table_info(sorteios)")
+                columns = {row[1] for row in cursor.fetchall()}
+                dezena_cols = [col for col in (f'd{i}' for i in range(1, 7)) if col in columns]
+                trevo_cols = [col for col in (f't{i}' for i in range(1, 3)) if col in columns]
                 
-                # Verificações básicas
-                total_rows = len(df)
+                # Todas as contagens numa única varredura feita pelo SQLite
+                # (dezenas 1-50, trevos 1-6), sem trazer a tabela para o Python
+                aggregates = [
+                    "COUNT(*)",
+                    "COUNT(*) - COUNT(DISTINCT concurso)",
+                    "MIN(concurso)",
+                    "MAX(concurso)",
+                ]
+                for col, max_value in [(col, 50) for col in dezena_cols] + [(col, 6) for col in trevo_cols]:
+                    aggregates.append(f"SUM(CASE WHEN {col} < 1 OR {col} > {max_value} THEN 1 ELSE 0 END)")
+                    aggregates.append(f"SUM({col} IS NULL)")
                 
-                # Verificar duplicatas de concurso
-                duplicates = df['concurso'].duplicated().sum()
+                cursor.execute(f"SELECT {', '.join(aggregates)} FROM sorteios")
+                row = cursor.fetchone()
                 
-                # Verificar ranges de dezenas (1-50)
-                dezena_cols = [f'd{i}' for i in range(1, 7)]
-                dezena_issues = {}
-                
-                for col in dezena_cols:
-                    if col in df.columns:
-                        out_of_range = ((df[col] < 1) | (df[col] > 50)).sum()
-                        nulls = df[col].isnull().sum()
-                        dezena_issues[col] = {
-                            "out_of_range": out_of_range,
-                            "nulls": nulls
-                        }
+                total_rows, duplicates, min_concurso, max_concurso = row[:4]
+                if total_rows == 0:
+                    return {"error": "No data found in sorteios table"}
                 
-                # Verificar ranges de trevos (1-6)
-                trevo_cols = [f't{i}' for i in range(1, 3)]
+                issues = iter(row[4:])
+                dezena_issues = {}
                 trevo_issues = {}
+                for col in dezena_cols + trevo_cols:
+                    target = dezena_issues if col in dezena_cols else trevo_issues
+                    target[col] = {"out_of_range": next(issues), "nulls": next(issues)}
                 
-                for col in trevo_cols:
-                    if col in df.columns:
-                        out_of_range = ((df[col] < 1) | (df[col] > 6)).sum()
-                        nulls = df[col].isnull().sum()
-                        trevo_issues[col] = {
-                            "out_of_range": out_of_range,
-                            "nulls": nulls
-                        }
-                
-                # Verificar concursos sequenciais
-                if 'concurso' in df.columns:
-                    sorted_df = df.sort_values('concurso')
-                    gaps = []
-                    for i in range(1, len(sorted_df)):
-                        current = sorted_df.iloc[i]['concurso']
-                        previous = sorted_df.iloc[i-1]['concurso']
-                        if current - previous > 1:
-                            gaps.append((previous, current))
+                # Verificar concursos sequenciais: o SQLite compara cada
+                # concurso com o seguinte e só os gaps chegam ao Python
+                cursor.execute("""
+                    SELECT concurso, next_concurso FROM (
+                        SELECT concurso, LEAD(concurso) OVER (ORDER BY concurso) AS next_concurso
+                        FROM sorteios
+                    )
+                    WHERE next_concurso - concurso > 1
+                    ORDER BY concurso
+                """)
+                all_gaps = cursor.fetchall()
+                total_gaps = len(all_gaps)
+                gaps = all_gaps[:10]
                 
                 return {
                     "total_rows": total_rows,
                     "duplicate_concursos": duplicates,
                     "dezena_issues": dezena_issues,
                     "trevo_issues": trevo_issues,
-                    "sequential_gaps": gaps[:10],  # Primeiros 10 gaps
-                    "total_gaps": len(gaps),
-                    "min_concurso": int(df['concurso'].min()) if 'concurso' in df.columns else None,
-                    "max_concurso": int(df['concurso'].max()) if 'concurso' in df.columns else None
+                    "sequential_gaps": gaps,  # Primeiros 10 gaps
+                    "total_gaps": total_gaps,
+                    "min_concurso": min_concurso,
+                    "max_concurso": max_concurso
                 }
                 
         except Exception as e:
             return {"error": f"Failed to check data integrity: {e}"}
     
-    def export_sample_data(self, output_dir: str = "outputs", sample_size: int = 10) -> Dict[str, Any]:
-        """Exporta amostra dos dados para inspeção"""
+    def export_sample_data(self, output_dir: str = "outputs", sample_size: int = 10,
+                           dump_format: Literal["csv", "parquet", "none"] = "csv") -> Dict[str, Any]:
+        """Exporta amostra dos dados para inspeção
+        
+        dump_format define o export completo: "csv" (dump.csv, padrão lido
+        pelo self_check), "parquet" (dump.parquet com zstd, menor e mais
+        rápido para consumo por outras ferramentas) ou "none" (só o preview).
+        """
+        if dump_format not in ("csv", "parquet", "none"):
+            return {"error": f"Invalid dump format: {dump_format}"}
+        
         try:
             output_path = self.project_root / output_dir
             output_path.mkdir(exist_ok=True)
             
+            preview_csv_path = output_path / "dump_preview.csv"
+            result = {}
+            
             with sqlite3.connect(self.full_db_path) as conn:
-                # Export completo
-                df_full = pd.read_sql_query("SELECT * FROM sorteios ORDER BY concurso", conn)
-                full_csv_path = output_path / "dump.csv"
-                df_full.to_csv(full_csv_path, index=False)
+                cursor = conn.cursor()
+                
+                if dump_format == "csv":
+                    # Export completo, gravado em blocos direto do cursor
+                    full_csv_path = output_path / "dump.csv"
+                    cursor.execute("SELECT * FROM sorteios ORDER BY concurso")
+                    header = [d[0] for d in cursor.description]
+                    full_rows = 0
+                    with open(full_csv_path, "w", newline="", encoding="utf-8") as f:
+                        writer = csv.writer(f, lineterminator="\n")
+                        writer.writerow(header)
+                        while rows := cursor.fetchmany(4096):
+                            writer.writerows(rows)
+                            full_rows += len(rows)
+                    result.update(full_export=str(full_csv_path), full_rows=full_rows)
+                elif dump_format == "parquet":
+                    # Export completo colunar, sem formatar linha a linha
+                    full_parquet_path = output_path / "dump.parquet"
+                    df_full = pl.read_database("SELECT * FROM sorteios ORDER BY concurso", connection=conn)
+                    df_full.write_parquet(full_parquet_path, compression="zstd")
+                    result.update(full_export=str(full_parquet_path), full_rows=df_full.height)
                 
                 # Export preview (primeiras linhas)
-                df_preview = df_full.head(sample_size)
-                preview_csv_path = output_path / "dump_preview.csv"
-                df_preview.to_csv(preview_csv_path, index=False)
+                cursor.execute("SELECT * FROM sorteios ORDER BY concurso LIMIT ?", (sample_size,))
+                header = [d[0] for d in cursor.description]
+                preview = cursor.fetchall()
+                with open(preview_csv_path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f, lineterminator="\n")
+                    writer.writerow(header)
+                    writer.writerows(preview)
                 
-                return {
-                    "full_export": str(full_csv_path),
-                    "preview_export": str(preview_csv_path),
-                    "full_rows": len(df_full),
-                    "preview_rows": len(df_preview)
-                }
+                result.update(preview_export=str(preview_csv_path), preview_rows=len(preview))
+                return result
                 
         except Exception as e:
             return {"error": f"Failed to export data: {e}"}
     
-    def run_full_audit(self) -> Dict[str, Any]:
-        """Executa auditoria completa"""
+    def iter_audit_sections(self, include_export: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Executa a auditoria seção a seção, entregando (nome, resultado).
+        
+        As verificações são independentes (cada uma abre a própria conexão)
+        e rodam em paralelo numa thread pool; as seções são entregues na
+        ordem fixa abaixo, cada uma assim que estiver pronta, permitindo
+        exibir o progresso incrementalmente. A última seção é "audit_status",
+        com o status geral calculado a partir das anteriores.
+        
+        Com include_export=False a seção "export_results" (que grava os
+        dumps em disco) é omitida; o status geral não depende dela.
+        """
         logger.info("Starting full database audit...")
         
-        audit_results = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "database_info": self.get_database_info(),
-            "table_info": self.get_table_info(),
-            "data_integrity": self.check_data_integrity(),
-            "export_results": self.export_sample_data()
-        }
+        checks = (
+            ("database_info", self.get_database_info),
+            ("table_info", self.get_table_info),
+            ("data_integrity", self.check_data_integrity),
+        )
+        if include_export:
+            checks += (("export_results", self.export_sample_data),)
+        sections = {}
+        if not self.check_database_exists():
+            # sqlite3.connect criaria um banco vazio no caminho: as
+            # verificações não rodam e todas as seções reportam o erro
+            for name, _ in checks:
+                sections[name] = {"error": "Database not found"}
+                yield name, sections[name]
+        else:
+            with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+                futures = [(name, executor.submit(check)) for name, check in checks]
+                for name, future in futures:
+                    sections[name] = future.result()
+                    yield name, sections[name]
         
         # Determinar status geral
         issues = []
         
         # Verificar se DB existe
-        if "error" in audit_results["database_info"]:
+        if "error" in sections["database_info"]:
             issues.append("Database not found")
         
         # Verificar contagem mínima
-        table_info = audit_results["table_info"]
+        table_info = sections["table_info"]
         if "error" not in table_info and "details" in table_info:
             concursos_count = table_info["details"].get("sorteios", {}).get("row_count", 0)
             if concursos_count < 275:
                 issues.append(f"Insufficient data: {concursos_count} rows (minimum 275)")
         
         # Verificar integridade
-        integrity = audit_results["data_integrity"]
+        integrity = sections["data_integrity"]
         if "error" not in integrity:
             if integrity.get("duplicate_concursos", 0) > 0:
                 issues.append(f"Found {integrity['duplicate_concursos']} duplicate concursos")
@@ -231,20 +287,55 @@ class DatabaseInspector:
                 if issues_data["nulls"] > 0:
                     issues.append(f"{col}: {issues_data['nulls']} null values")
         
-        audit_results["audit_status"] = {
+        logger.info(f"Audit completed. Status: {'PASS' if len(issues) == 0 else 'FAIL'}")
+        if issues:
+            for issue in issues:
+                logger.warning(f"Issue: {issue}")
+        
+        yield "audit_status", {
             "passed": len(issues) == 0,
             "issues_found": len(issues),
             "issues": issues
         }
+    
+    def run_full_audit(self, use_cache: bool = True) -> Dict[str, Any]:
+        """Executa auditoria completa
         
-        logger.info(f"Audit completed. Status: {'PASS' if len(issues) == 0 else 'FAIL'}")
-        if issues:
-            for issue in issues:
-                logger.warning(f"Issue: {issue}")
+        Com use_cache, as verificações somente leitura são reaproveitadas
+        enquanto o arquivo do banco não mudar (mesmo mtime e tamanho); os
+        exports (dump.csv e preview) são sempre regravados.
+        """
+        audit_results = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        
+        try:
+            stat = self.full_db_path.stat()
+        except OSError:
+            use_cache = False
         
+        if use_cache:
+            sections = _cached_audit_sections(
+                str(self.full_db_path), str(self.project_root), stat.st_mtime_ns, stat.st_size
+            )
+            sections = copy.deepcopy(dict(sections))
+            audit_status = sections.pop("audit_status")
+            audit_results.update(sections)
+            audit_results["export_results"] = self.export_sample_data()
+            audit_results["audit_status"] = audit_status
+        else:
+            audit_results.update(self.iter_audit_sections())
         return audit_results
 
 
+@lru_cache(maxsize=4)
+def _cached_audit_sections(full_db_path: str, project_root: str,
+                           mtime_ns: int, size: int) -> Tuple[Tuple[str, Dict[str, Any]], ...]:
+    """Seções somente leitura da auditoria de uma versão do banco (mtime_ns e size fazem parte da chave)."""
+    inspector = DatabaseInspector()
+    inspector.full_db_path = Path(full_db_path)
+    inspector.project_root = Path(project_root)
+    return tuple(inspector.iter_audit_sections(include_export=False))
+
+
 def main():
     """Função principal para execução via linha de comando"""
     inspector = DatabaseInspector()
@@ -293,7 +384,8 @@ def main():
     export_info = results["export_results"]
     if "error" not in export_info:
         print(f"\nEXPORTS:")
-        print(f"  Full dump: {export_info['full_export']} ({export_info['full_rows']} rows)")
+        if "full_export" in export_info:
+            print(f"  Full dump: {export_info['full_export']} ({export_info['full_rows']} rows)")
         print(f"  Preview: {export_info['preview_export']} ({export_info['preview_rows']} rows)")
     
     print("\n" + "="*60)
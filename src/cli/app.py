@@ -1,21 +1,76 @@
 """CLI principal para pipeline completo da +Milionária."""
 
 import argparse
+import hashlib
+import math
 import sys
 import os
 import time
+from operator import itemgetter
 from pathlib import Path
 
-# Adicionar src ao path
-src_path = Path(__file__).parent.parent
-sys.path.insert(0, str(src_path))
+# Os módulos do pipeline (polars, sklearn, ray, openpyxl...) são importados
+# dentro de run_pipeline, na etapa que os usa: --help, --version e erros de
+# argumento respondem sem pagar esse custo
 
-from etl.from_db import load_draws
-from features.make import build_number_features, latest_feature_snapshot
-from models.scoring import learn_weights_ridge, score_numbers
-from generate.tickets import generate_candidates, apply_filters, assign_trevos, load_filters_config
-from simulate.backtest_ray import run_backtest_parallel, print_backtest_summary
-from generate.export import export_excel
+# Cache em disco de pesos e scores (etapa 2) por versão do banco
+PIPELINE_CACHE_DIR = Path.home() / ".cache" / "milionaria"
+
+# Arquivos de cache mantidos; os mais antigos são apagados a cada gravação
+PIPELINE_CACHE_MAX_ENTRIES = 8
+
+# Módulos que determinam pesos e scores: mudou o código, muda a chave
+_PIPELINE_CACHE_SOURCES = (
+    "etl/from_db.py",
+    "features/make.py",
+    "models/scoring.py",
+    "models/scoring_numba.py",
+)
+
+
+def _pipeline_code_version() -> str:
+    """Hash do código-fonte dos módulos de leitura, features e scoring."""
+    src_dir = Path(__file__).resolve().parent.parent
+    digest = hashlib.blake2b(digest_size=16)
+    for name in _PIPELINE_CACHE_SOURCES:
+        digest.update(name.encode("utf-8"))
+        digest.update((src_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+def _pipeline_cache_path(db_path: str, **training_options) -> Path:
+    """Arquivo de cache da etapa 2 para o banco em seu estado atual.
+    
+    A chave combina caminho absoluto, mtime e tamanho do banco, a versão do
+    código de leitura/features/scoring e as opções de treino: qualquer atualização
+    dos dados, do código ou das opções gera um arquivo novo.
+    """
+    stat = os.stat(db_path)
+    options = ",".join(f"{k}={v!r}" for k, v in sorted(training_options.items()))
+    key = (f"{Path(db_path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+           f"|{_pipeline_code_version()}|{options}")
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return PIPELINE_CACHE_DIR / f"weights_scores_{digest}.joblib"
+
+
+def _prune_pipeline_cache(keep: int = PIPELINE_CACHE_MAX_ENTRIES) -> None:
+    """Apaga os arquivos de cache da etapa 2 além dos `keep` mais recentes.
+    
+    Cada versão do banco, do código ou das opções gera um arquivo novo;
+    sem a poda o diretório cresceria indefinidamente.
+    """
+    entries = []
+    for path in PIPELINE_CACHE_DIR.glob("weights_scores_*.joblib"):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue  # Removido por outra execução
+    entries.sort(reverse=True)
+    for _, path in entries[keep:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
 
 
 def run_pipeline(db_path: str = "db/milionaria.db",
@@ -23,7 +78,11 @@ def run_pipeline(db_path: str = "db/milionaria.db",
                 seed: int = 42,
                 n_show: int = 10,
                 verbose: bool = True,
-                export_path: str = None) -> list:
+                export_path: str = None,
+                use_cache: bool = True,
+                num_workers: int = None,
+                batch_size: int = None,
+                fast_ridge: bool = False) -> list:
     """Executa pipeline completo da +Milionária.
     
     Args:
@@ -33,65 +92,130 @@ def run_pipeline(db_path: str = "db/milionaria.db",
         n_show: Número de bilhetes para mostrar
         verbose: Se deve imprimir logs detalhados
         export_path: Caminho para exportar resultados em Excel (opcional)
+        use_cache: Se deve reaproveitar pesos e scores já calculados para o
+            banco no mesmo estado (cache em ~/.cache/milionaria)
+        num_workers: Processos do backtest (padrão: núcleos da CPU, limitado
+            ao número de bilhetes)
+        batch_size: Bilhetes por lote do backtest (padrão: bilhetes divididos
+            entre os workers, mínimo 4)
+        fast_ridge: Se deve ajustar o Ridge em forma fechada com Numba
+            (models.scoring_numba) em vez do sklearn; faz parte da chave do
+            cache, então nunca reaproveita pesos do outro ajuste
         
     Returns:
         Lista de resultados do backtest ordenados por score
     """
     start_time = time.time()
     
+    # Mensagens de progresso acumuladas e escritas de uma vez ao fim de cada
+    # etapa: uma escrita em stdout por etapa, não uma por linha
+    report = []
+    log = report.append
+    
+    def flush_report():
+        if report:
+            sys.stdout.write("\n".join(report) + "\n")
+            sys.stdout.flush()
+            report.clear()
+    
     if verbose:
-        print("🎯 === Pipeline +Milionária AI ===")
-        print(f"📊 Configurações:")
-        print(f"   - Database: {db_path}")
-        print(f"   - Config: {config_path}")
-        print(f"   - Seed: {seed}")
-        print(f"   - Top bilhetes: {n_show}")
+        log("🎯 === Pipeline +Milionária AI ===")
+        log(f"📊 Configurações:")
+        log(f"   - Database: {db_path}")
+        log(f"   - Config: {config_path}")
+        log(f"   - Seed: {seed}")
+        log(f"   - Top bilhetes: {n_show}")
     
     # 1. Carregar dados do banco
     if verbose:
-        print("\n📥 1. Carregando dados do banco...")
+        log("\n📥 1. Carregando dados do banco...")
     
     try:
+        from ..etl.from_db import load_draws
+        
         df = load_draws(db_path)
         if verbose:
-            print(f"   ✓ {len(df)} sorteios carregados")
+            log(f"   ✓ {len(df)} sorteios carregados")
+        flush_report()
     except Exception as e:
+        flush_report()
         print(f"   ❌ Erro ao carregar dados: {e}")
         return []
     
     # 2. Gerar features e aprender pesos
     if verbose:
-        print("\n🧠 2. Gerando features e treinando modelo...")
+        log("\n🧠 2. Gerando features e treinando modelo...")
     
     try:
-        features = build_number_features(df)
-        snapshot = latest_feature_snapshot(df)
+        import joblib
         
-        if verbose:
-            print(f"   ✓ Features: {len(features)} amostras")
-            print(f"   ✓ Snapshot: {len(snapshot)} números")
-        
-        model, scaler, weights = learn_weights_ridge(features)
+        cache_path = _pipeline_cache_path(db_path, fast_ridge=fast_ridge) if use_cache else None
+        cached = None
+        if cache_path is not None and cache_path.exists():
+            try:
+                cached = joblib.load(cache_path)
+                if len(cached) != 3:
+                    cached = None  # Formato antigo (sem R²): recalcula
+            except Exception:
+                cached = None  # Cache ilegível: recalcula
         
-        if verbose:
-            print(f"   ✓ Modelo treinado")
-            print(f"   ✓ Weights: {weights}")
-            print(f"   ✓ Calculando scores...")
-        
-        scores = score_numbers(snapshot, weights)
+        if cached is not None:
+            weights, scores, r2_train = cached
+            
+            if verbose:
+                log(f"   ✓ Pesos e scores carregados do cache ({cache_path.name})")
+                log(f"   ✓ Modelo do cache (R² = {r2_train:.4f})")
+                log(f"   ✓ Weights: {weights}")
+        else:
+            from ..features.make import build_number_features, latest_feature_snapshot
+            from ..models.scoring import learn_weights_ridge, score_numbers
+            if fast_ridge:
+                # Mesmo resultado do sklearn; sem Numba, roda em NumPy
+                from ..models.scoring_numba import learn_weights_ridge
+            
+            features = build_number_features(df)
+            snapshot = latest_feature_snapshot(df)
+            
+            if verbose:
+                log(f"   ✓ Features: {len(features)} amostras")
+                log(f"   ✓ Snapshot: {len(snapshot)} números")
+            
+            # learn_weights_ridge escreve em stdout: mantém a ordem das linhas
+            flush_report()
+            model, scaler, weights, r2_train = learn_weights_ridge(features)
+            
+            if verbose:
+                log(f"   ✓ Modelo treinado (R² = {r2_train:.4f})")
+                log(f"   ✓ Weights: {weights}")
+                log(f"   ✓ Calculando scores...")
+            
+            scores = score_numbers(snapshot, weights)
+            
+            if cache_path is not None:
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    joblib.dump((weights, scores, r2_train), cache_path)
+                    _prune_pipeline_cache()
+                except OSError:
+                    pass  # Sem cache: a próxima execução recalcula
         
         if verbose:
-            print(f"   ✓ Scores calculados para {len(scores)} números")
+            log(f"   ✓ Scores calculados para {len(scores)} números")
+        flush_report()
     
     except Exception as e:
+        flush_report()
         print(f"   ❌ Erro no treinamento: {e}")
         return []
     
     # 3. Gerar candidatos e aplicar filtros
     if verbose:
-        print("\n🎲 3. Gerando candidatos e aplicando filtros...")
+        log("\n🎲 3. Gerando candidatos e aplicando filtros...")
     
     try:
+        from ..generate.tickets import generate_candidates, apply_filters, assign_trevos, load_filters_config
+        
+        # load_filters_config mantém o YAML em cache enquanto o arquivo não muda
         config = load_filters_config(config_path)
         
         # Gerar candidatos
@@ -104,13 +228,13 @@ def run_pipeline(db_path: str = "db/milionaria.db",
         )
         
         if verbose:
-            print(f"   ✓ {len(tickets)} candidatos gerados")
+            log(f"   ✓ {len(tickets)} candidatos gerados")
         
         # Aplicar filtros
         filtered_tickets = apply_filters(tickets, config['filters'])
         
         if verbose:
-            print(f"   ✓ {len(filtered_tickets)} tickets após filtros ({len(filtered_tickets)/len(tickets)*100:.1f}% aprovação)")
+            log(f"   ✓ {len(filtered_tickets)} tickets após filtros ({len(filtered_tickets)/len(tickets)*100:.1f}% aprovação)")
         
         # Atribuir trevos
         top_tickets = filtered_tickets[:config['output']['top_k']]
@@ -121,73 +245,87 @@ def run_pipeline(db_path: str = "db/milionaria.db",
         )
         
         if verbose:
-            print(f"   ✓ {len(complete_tickets)} bilhetes completos gerados")
+            log(f"   ✓ {len(complete_tickets)} bilhetes completos gerados")
+        flush_report()
     
     except Exception as e:
+        flush_report()
         print(f"   ❌ Erro na geração: {e}")
         return []
     
     # 4. Executar backtest
     if verbose:
-        print("\n📈 4. Executando backtest paralelo...")
+        log("\n📈 4. Executando backtest paralelo...")
     
     try:
+        from ..simulate.backtest_ray import run_backtest_parallel, print_backtest_summary
+        
+        n_tickets = len(complete_tickets)
+        workers = num_workers or min(os.cpu_count() or 2, max(1, n_tickets))
+        batch = batch_size or max(4, math.ceil(n_tickets / workers))
+        
+        # Cabeçalho visível antes da etapa mais longa
+        flush_report()
         results = run_backtest_parallel(
             complete_tickets, 
             df, 
-            num_workers=4, 
-            batch_size=max(1, len(complete_tickets) // 4)
+            num_workers=workers, 
+            batch_size=batch
         )
         
         if verbose:
-            print(f"   ✓ Backtest concluído para {len(results)} bilhetes")
+            log(f"   ✓ Backtest concluído para {len(results)} bilhetes")
+        flush_report()
     
     except Exception as e:
+        flush_report()
         print(f"   ❌ Erro no backtest: {e}")
         return []
     
     # 5. Mostrar resultados
     if verbose:
         elapsed = time.time() - start_time
-        print(f"\n⏱️  Pipeline concluído em {elapsed:.2f}s")
+        log(f"\n⏱️  Pipeline concluído em {elapsed:.2f}s")
+        flush_report()
         
         print_backtest_summary(results, top_k=n_show)
         
         # Estatísticas adicionais
         if results:
             best_result = results[0]
-            print(f"\n🏆 Melhor bilhete:")
-            print(f"   Dezenas: {best_result['dezenas']}")
-            print(f"   Trevos: {best_result['trevos']}")
-            print(f"   Score: {best_result['score']:.4f}")
-            print(f"   Acertos médios (dezenas): {best_result['avg_hits_dezenas']:.2f}")
-            print(f"   Acertos médios (trevos): {best_result['avg_hits_trevos']:.2f}")
-            print(f"   Máximo acertos (dezenas): {best_result['max_hits_dezenas']}")
-            print(f"   Máximo acertos (trevos): {best_result['max_hits_trevos']}")
+            log(f"\n🏆 Melhor bilhete:")
+            log(f"   Dezenas: {best_result['dezenas']}")
+            log(f"   Trevos: {best_result['trevos']}")
+            log(f"   Score: {best_result['score']:.4f}")
+            log(f"   Acertos médios (dezenas): {best_result['avg_hits_dezenas']:.2f}")
+            log(f"   Acertos médios (trevos): {best_result['avg_hits_trevos']:.2f}")
+            log(f"   Máximo acertos (dezenas): {best_result['max_hits_dezenas']}")
+            log(f"   Máximo acertos (trevos): {best_result['max_hits_trevos']}")
             
             if best_result['winning_draws']:
-                print(f"   Sorteios com acertos: {len(best_result['winning_draws'])}")
-                print(f"   Melhor sorteio: Concurso {best_result['winning_draws'][0]['concurso']} ({best_result['winning_draws'][0]['hits_dezenas']}+{best_result['winning_draws'][0]['hits_trevos']})")
+                log(f"   Sorteios com acertos: {len(best_result['winning_draws'])}")
+                log(f"   Melhor sorteio: Concurso {best_result['winning_draws'][0]['concurso']} ({best_result['winning_draws'][0]['hits_dezenas']}+{best_result['winning_draws'][0]['hits_trevos']})")
+        flush_report()
     
     # 6. Exportar resultados se solicitado
     if export_path and results:
         if verbose:
-            print(f"\n📄 6. Exportando resultados para {export_path}...")
+            log(f"\n📄 6. Exportando resultados para {export_path}...")
         
         try:
+            from ..generate.export import export_excel
+            
             # Extrair apenas dezenas e trevos dos resultados do backtest
-            tickets_for_export = []
-            for result in results:
-                dezenas = result['dezenas']
-                trevos = result['trevos']
-                tickets_for_export.append((dezenas, trevos))
+            # (export_excel precisa de uma sequência: valida tamanho antes)
+            tickets_for_export = list(map(itemgetter('dezenas', 'trevos'), results))
             
             export_excel(tickets_for_export, export_path)
             if verbose:
-                print(f"   ✓ Resultados exportados com sucesso")
+                log(f"   ✓ Resultados exportados com sucesso")
         except Exception as e:
             if verbose:
-                print(f"   ❌ Erro na exportação: {e}")
+                log(f"   ❌ Erro na exportação: {e}")
+        flush_report()
     
     return results
 
@@ -244,6 +382,31 @@ Exemplos:
         help="Caminho para exportar resultados em Excel (ex: results.xlsx)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processos do backtest (default: número de núcleos da CPU)"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Bilhetes por lote do backtest (default: bilhetes / workers, mínimo 4)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recalcula features e pesos mesmo com cache válido para o banco"
+    )
+    
+    parser.add_argument(
+        "--fast-ridge",
+        action="store_true",
+        help="Ajusta o Ridge em forma fechada com Numba (models/scoring_numba.py); "
+             "o cache de pesos é separado por essa opção"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
@@ -269,7 +432,11 @@ Exemplos:
             seed=args.seed,
             n_show=args.n_show,
             verbose=not args.quiet,
-            export_path=args.export
+            export_path=args.export,
+            use_cache=not args.no_cache,
+            num_workers=args.workers,
+            batch_size=args.batch_size,
+            fast_ridge=args.fast_ridge
         )
         
         if not results:
@@ -277,10 +444,13 @@ Exemplos:
             sys.exit(1)
         
         if args.quiet:
-            # Modo silencioso - apenas top bilhetes
-            print(f"Top {args.n_show} bilhetes:")
-            for i, result in enumerate(results[:args.n_show]):
-                print(f"{i+1:2d}. {result['dezenas']} + {result['trevos']} (score: {result['score']:.4f})")
+            # Modo silencioso - apenas top bilhetes, numa única escrita
+            lines = [f"Top {args.n_show} bilhetes:"]
+            lines.extend(
+                f"{i+1:2d}. {result['dezenas']} + {result['trevos']} (score: {result['score']:.4f})"
+                for i, result in enumerate(results[:args.n_show])
+            )
+            sys.stdout.write("\n".join(lines) + "\n")
         
         print("\n✅ Pipeline executado com sucesso!")
         
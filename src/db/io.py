@@ -1,16 +1,77 @@
 """Módulo para operações de entrada/saída do banco de dados."""
 
-import pandas as pd
+import os
+from functools import lru_cache
+
 from sqlalchemy import text
 from .schema import get_engine
 
 
-def upsert_rows(df, db_path="db/milionaria.db"):
+# Colunas gravadas na tabela sorteios
+REQUIRED_COLUMNS = ['concurso', 'data', 'd1', 'd2', 'd3', 'd4', 'd5', 'd6', 't1', 't2']
+
+
+def _records_from_polars(df):
+    """Registros (dicts) a partir de um DataFrame Polars, sem pandas."""
+    import polars as pl
+    
+    data_dtype = df.schema['data']
+    data_expr = pl.col('data')
+    if data_dtype in (pl.Date, pl.Datetime):
+        data_expr = data_expr.dt.strftime('%Y-%m-%d')
+    
+    df_clean = df.select(REQUIRED_COLUMNS).unique(
+        subset=['concurso'], keep='last', maintain_order=True
+    ).with_columns(
+        pl.col([col for col in REQUIRED_COLUMNS if col != 'data']).cast(pl.Int64),
+        data_expr
+    )
+    return df_clean.rows(named=True)
+
+
+def _records_from_pandas(df):
+    """Registros (dicts) a partir de um DataFrame pandas."""
+    import pandas as pd
+    
+    # Seleciona apenas as colunas necessárias
+    df_clean = df[REQUIRED_COLUMNS].copy()
+    
+    # Remove duplicatas no DataFrame baseado em 'concurso'
+    df_clean = df_clean.drop_duplicates(subset=['concurso'], keep='last')
+    
+    # Conversões feitas por coluna, não por linha
+    int_cols = [col for col in REQUIRED_COLUMNS if col != 'data']
+    df_clean[int_cols] = df_clean[int_cols].astype('int64')
+    
+    # Converte data para string se for Timestamp/date. O tipo dos valores de
+    # uma coluna object é inferido de uma vez (em C); só colunas mistas caem
+    # na conversão valor a valor
+    data_kind = pd.api.types.infer_dtype(df_clean['data'], skipna=True)
+    if df_clean['data'].dtype.kind == 'M' or data_kind in ('date', 'datetime', 'datetime64'):
+        df_clean['data'] = pd.to_datetime(df_clean['data']).dt.strftime('%Y-%m-%d')
+    elif data_kind != 'string':
+        df_clean['data'] = [
+            value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else value
+            for value in df_clean['data']
+        ]
+    
+    return df_clean.to_dict(orient='records')
+
+
+def upsert_rows(df, db_path="db/milionaria.db", fast=False):
     """Insere ou atualiza linhas na tabela sorteios sem duplicar concurso.
     
+    Aceita DataFrame pandas ou Polars, ou pyarrow.Table. Entradas Polars e
+    Arrow são processadas sem importar pandas.
+    
     Args:
-        df (pandas.DataFrame): DataFrame com colunas: concurso, data, d1-d6, t1, t2
+        df (pandas.DataFrame | polars.DataFrame | pyarrow.Table): Dados com
+            colunas: concurso, data, d1-d6, t1, t2
         db_path (str): Caminho para o arquivo do banco de dados
+        fast (bool): Carga em lote sem fsync no commit (synchronous=OFF) e
+            temporários em memória. Só para a importação inicial, que basta
+            refazer: uma queda durante o commit pode corromper o banco, então
+            atualizações incrementais usam o padrão (False)
         
     Returns:
         int: Número de linhas afetadas
@@ -18,48 +79,42 @@ def upsert_rows(df, db_path="db/milionaria.db"):
     engine = get_engine(db_path)
     
     # Valida colunas obrigatórias
-    required_cols = ['concurso', 'data', 'd1', 'd2', 'd3', 'd4', 'd5', 'd6', 't1', 't2']
-    missing_cols = [col for col in required_cols if col not in df.columns]
+    columns = df.column_names if hasattr(df, 'column_names') else df.columns
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
     if missing_cols:
         raise ValueError(f"Colunas obrigatórias ausentes: {missing_cols}")
     
-    # Seleciona apenas as colunas necessárias
-    df_clean = df[required_cols].copy()
+    library = type(df).__module__.split('.')[0]
+    if library == 'pyarrow':
+        import polars as pl
+        df = pl.from_arrow(df)
+        library = 'polars'
     
-    # Remove duplicatas no DataFrame baseado em 'concurso'
-    df_clean = df_clean.drop_duplicates(subset=['concurso'], keep='last')
+    if library == 'polars':
+        records = _records_from_polars(df)
+    else:
+        records = _records_from_pandas(df)
     
-    rows_affected = 0
+    # Upsert (INSERT OR REPLACE no SQLite) de todas as linhas num único
+    # executemany, dentro de uma transação
+    query = text("""
+        INSERT OR REPLACE INTO sorteios 
+        (concurso, data, d1, d2, d3, d4, d5, d6, t1, t2)
+        VALUES (:concurso, :data, :d1, :d2, :d3, :d4, :d5, :d6, :t1, :t2)
+    """)
     
-    with engine.connect() as conn:
-        # Para cada linha, faz upsert (INSERT OR REPLACE no SQLite)
-        for _, row in df_clean.iterrows():
-            query = text("""
-                INSERT OR REPLACE INTO sorteios 
-                (concurso, data, d1, d2, d3, d4, d5, d6, t1, t2)
-                VALUES (:concurso, :data, :d1, :d2, :d3, :d4, :d5, :d6, :t1, :t2)
-            """)
-            
-            # Converte data para string se for Timestamp
-            data_value = row['data']
-            if hasattr(data_value, 'strftime'):
-                data_value = data_value.strftime('%Y-%m-%d')
-            
-            result = conn.execute(query, {
-                'concurso': int(row['concurso']),
-                'data': data_value,
-                'd1': int(row['d1']),
-                'd2': int(row['d2']),
-                'd3': int(row['d3']),
-                'd4': int(row['d4']),
-                'd5': int(row['d5']),
-                'd6': int(row['d6']),
-                't1': int(row['t1']),
-                't2': int(row['t2'])
-            })
-            rows_affected += result.rowcount
-        
-        conn.commit()
+    if records:
+        with engine.begin() as conn:
+            if fast:
+                # Só vale para esta conexão (NullPool: descartada ao final)
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+                conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+            conn.execute(query, records)
+    
+    rows_affected = len(records)
+    
+    # Dados alterados: descartar leitura em cache
+    _read_all_sorteios_cached.cache_clear()
     
     print(f"Upsert concluído: {rows_affected} linhas afetadas")
     return rows_affected
@@ -77,32 +132,68 @@ def read_max_concurso(db_path="db/milionaria.db"):
     engine = get_engine(db_path)
     
     with engine.connect() as conn:
-        query = text("SELECT MAX(concurso) as max_concurso FROM sorteios")
+        # Último concurso lido direto da ponta do índice de concurso (chave
+        # primária), sem agregação
+        query = text("SELECT concurso FROM sorteios ORDER BY concurso DESC LIMIT 1")
         result = conn.execute(query)
         row = result.fetchone()
         
-        max_concurso = row[0] if row[0] is not None else 0
+        max_concurso = row[0] if row is not None and row[0] is not None else 0
         return max_concurso
 
 
-def read_all_sorteios(db_path="db/milionaria.db"):
-    """Lê todos os sorteios da tabela.
+@lru_cache(maxsize=1)
+def _read_all_sorteios_cached(db_path, db_mtime, since_concurso=None, limit=None):
+    """Leitura de read_all_sorteios memoizada por (caminho, mtime do arquivo, filtros)."""
+    # pandas só é importado aqui: read_max_concurso e upsert_rows não o usam
+    import pandas as pd
+    
+    engine = get_engine(db_path)
+    
+    # Filtros aplicados no SQL: só as linhas pedidas saem do banco
+    where = ""
+    params = {}
+    if since_concurso is not None:
+        where = "WHERE concurso > :since"
+        params["since"] = int(since_concurso)
+    
+    if limit is None:
+        query = f"SELECT * FROM sorteios {where} ORDER BY concurso"
+    else:
+        # Os `limit` concursos mais recentes, devolvidos em ordem crescente
+        query = f"""
+            SELECT * FROM (
+                SELECT * FROM sorteios {where} ORDER BY concurso DESC LIMIT :limit
+            ) ORDER BY concurso
+        """
+        params["limit"] = int(limit)
+    
+    return pd.read_sql(text(query), engine, params=params)
+
+
+def read_all_sorteios(db_path="db/milionaria.db", since_concurso=None, limit=None):
+    """Lê os sorteios da tabela.
+    
+    Sem filtros, lê todos. O resultado fica em cache até o arquivo do banco
+    mudar (mtime) ou upsert_rows gravar novos dados.
     
     Args:
         db_path (str): Caminho para o arquivo do banco de dados
+        since_concurso (int, optional): Lê apenas concursos maiores que este
+        limit (int, optional): Lê apenas os `limit` concursos mais recentes
         
     Returns:
-        pandas.DataFrame: DataFrame com todos os sorteios
+        pandas.DataFrame: DataFrame com os sorteios, ordenado por concurso
     """
-    engine = get_engine(db_path)
+    db_mtime = os.path.getmtime(db_path) if os.path.exists(db_path) else None
     
-    query = "SELECT * FROM sorteios ORDER BY concurso"
-    df = pd.read_sql(query, engine)
-    return df
+    # Cópia para que alterações do chamador não contaminem o cache
+    return _read_all_sorteios_cached(str(db_path), db_mtime, since_concurso, limit).copy()
 
 
 if __name__ == "__main__":
     # Teste básico
+    import pandas as pd
     from .schema import ensure_schema
     
     engine = get_engine()
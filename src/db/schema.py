@@ -1,7 +1,10 @@
 """Módulo para definição do schema do banco de dados."""
 
 import os
-from sqlalchemy import create_engine, Column, Integer, Date, MetaData, Table
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event, Column, Integer, Date, MetaData, Table
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -11,6 +14,9 @@ Base = declarative_base()
 def get_engine(db_path="db/milionaria.db"):
     """Cria e retorna engine do SQLite.
     
+    A engine é criada uma única vez por caminho e reutilizada nas chamadas
+    seguintes.
+    
     Args:
         db_path (str): Caminho para o arquivo do banco de dados
         
@@ -20,8 +26,25 @@ def get_engine(db_path="db/milionaria.db"):
     # Garante que o diretório existe
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
-    # Cria engine SQLite
-    engine = create_engine(f"sqlite:///{db_path}", echo=False)
+    return _create_engine(str(db_path))
+
+
+@lru_cache(maxsize=None)
+def _create_engine(db_path):
+    """Cria a engine de db_path e configura cada nova conexão."""
+    # Cria engine SQLite. NullPool: conexões não ficam abertas entre usos,
+    # assim o arquivo pode ser removido/recriado (e liberado no Windows)
+    engine = create_engine(f"sqlite:///{db_path}", echo=False, poolclass=NullPool)
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # mmap: leituras pelo page cache. O journal_mode fica o padrão do
+        # arquivo: WAL mudaria o banco de forma permanente e as escritas só
+        # chegariam ao arquivo (e ao mtime que chaveia os caches) no checkpoint
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+    
     return engine
 
 
@@ -2,16 +2,49 @@
 
 Este módulo fornece funcionalidades para carregar dados dos sorteios
 da +Milionária em formato limpo para análise e modelagem de IA.
+
+Tipos das colunas carregadas: concurso Int32 (com sinal, pois as features
+subtraem concursos), data Date, D1-D6 e T1-T2 UInt8 (valores 1-50 e 1-6).
 """
 
 import sqlite3
 from pathlib import Path
-from typing import Union
+from typing import List, Optional, Union
 import polars as pl
 from datetime import date
 
+try:
+    import connectorx
+    CONNECTORX_AVAILABLE = True
+except ImportError:
+    CONNECTORX_AVAILABLE = False
+
+
+# Colunas do DataFrame padronizado -> coluna na tabela sorteios
+DRAW_COLUMNS = {
+    "concurso": "concurso", "data": "data",
+    "D1": "d1", "D2": "d2", "D3": "d3", "D4": "d4", "D5": "d5", "D6": "d6",
+    "T1": "t1", "T2": "t2",
+}
+
+# Tipos de carga por coluna da tabela
+_SCHEMA_OVERRIDES = {
+    "concurso": pl.Int32,
+    "data": pl.Int32,  # Dias desde 1970-01-01, calculados no SQL
+    "d1": pl.UInt8, "d2": pl.UInt8, "d3": pl.UInt8,
+    "d4": pl.UInt8, "d5": pl.UInt8, "d6": pl.UInt8,
+    "t1": pl.UInt8, "t2": pl.UInt8
+}
+
+# Expressão SQL de cada coluna: a data chega como número de dias desde a
+# época Unix, que o Polars reinterpreta como Date sem parsear strings
+_SQL_EXPRESSIONS = {
+    "data": "CAST(julianday(data) - 2440587.5 AS INTEGER) AS data",
+}
+
 
-def load_draws(db_path: Union[str, Path]) -> pl.DataFrame:
+def load_draws(db_path: Union[str, Path], lazy: bool = False,
+               columns: Optional[List[str]] = None) -> Union[pl.DataFrame, pl.LazyFrame]:
     """Carrega dados dos sorteios do banco de dados em formato limpo.
     
     Esta função extrai todos os sorteios da tabela 'sorteios' e retorna
@@ -20,9 +53,16 @@ def load_draws(db_path: Union[str, Path]) -> pl.DataFrame:
     
     Args:
         db_path (Union[str, Path]): Caminho para o arquivo do banco SQLite
+        lazy (bool): Se True, retorna um LazyFrame. A leitura do banco é
+            feita na hora (eager); só as conversões seguintes (data,
+            renomeação) e o que o chamador encadear ficam pendentes até o
+            collect(). O schema fica disponível via collect_schema()
+        columns (List[str], optional): Colunas a carregar (nomes padronizados,
+            ex.: ["concurso", "D1", "T1"]). Só essas são lidas do banco.
+            Padrão: todas
         
     Returns:
-        pl.DataFrame: DataFrame com colunas:
+        pl.DataFrame | pl.LazyFrame: DataFrame com colunas:
             - concurso (int): Número do concurso
             - data (date): Data do sorteio como objeto date
             - D1, D2, D3, D4, D5, D6 (int): Dezenas sorteadas (1-50)
@@ -30,6 +70,8 @@ def load_draws(db_path: Union[str, Path]) -> pl.DataFrame:
             
     Raises:
         FileNotFoundError: Se o arquivo do banco não existir
+        ValueError: Se columns contiver uma coluna desconhecida ou se algum
+            sorteio tiver data inválida
         sqlite3.Error: Se houver erro na consulta SQL
         
     Example:
@@ -42,52 +84,72 @@ def load_draws(db_path: Union[str, Path]) -> pl.DataFrame:
     if not db_path.exists():
         raise FileNotFoundError(f"Banco de dados não encontrado: {db_path}")
     
+    if columns is None:
+        columns = list(DRAW_COLUMNS)
+    unknown = [col for col in columns if col not in DRAW_COLUMNS]
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas: {unknown}")
+    sql_columns = [DRAW_COLUMNS[col] for col in columns]
+    
     try:
-        # Conecta ao banco SQLite
-        conn = sqlite3.connect(str(db_path))
-        
-        # Query SQL para extrair todos os dados
-        query = """
+        # Query SQL apenas com as colunas pedidas
+        query = f"""
         SELECT 
-            concurso,
-            data,
-            d1, d2, d3, d4, d5, d6,
-            t1, t2
+            {", ".join(_SQL_EXPRESSIONS.get(col, col) for col in sql_columns)}
         FROM sorteios 
         ORDER BY concurso
         """
         
-        # Executa a query e carrega em DataFrame Polars
-        df = pl.read_database(
-            query=query,
-            connection=conn,
-            schema_overrides={
-                "concurso": pl.Int32,
-                "data": pl.String,  # Carrega como string primeiro
-                "d1": pl.Int8, "d2": pl.Int8, "d3": pl.Int8,
-                "d4": pl.Int8, "d5": pl.Int8, "d6": pl.Int8,
-                "t1": pl.Int8, "t2": pl.Int8
-            }
-        )
+        schema_overrides = {col: _SCHEMA_OVERRIDES[col] for col in sql_columns}
+        
+        if CONNECTORX_AVAILABLE:
+            # connectorx lê direto para buffers Arrow em código nativo, sem
+            # montar uma tupla Python por linha
+            df = pl.read_database_uri(
+                query=query,
+                uri=f"sqlite://{db_path.resolve().as_posix()}",
+                engine="connectorx"
+            ).cast(schema_overrides)
+        else:
+            # Conexão somente leitura (sem immutable=1: o arquivo pode mudar
+            # enquanto o app está aberto), com mmap e cache maiores para a
+            # varredura completa
+            conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")
+            df = pl.read_database(
+                query=query,
+                connection=conn,
+                schema_overrides=schema_overrides
+            )
+            conn.close()
         
-        # Converte a coluna data de string para Date
-        df = df.with_columns(
-            pl.col("data").str.to_date("%Y-%m-%d").alias("data")
-        )
+        # julianday() devolve NULL para data malformada: falha aqui em vez de
+        # deixar o sorteio seguir sem data para as features
+        if "data" in sql_columns and df["data"].null_count() > 0:
+            invalid = df.filter(pl.col("data").is_null())
+            where = (f"concursos {invalid['concurso'].head(10).to_list()}"
+                     if "concurso" in sql_columns else f"{len(invalid)} sorteios")
+            raise ValueError(f"Data inválida no banco ({where})")
+        
+        frame = df.lazy() if lazy else df
+        
+        # Converte a coluna data de dias (Int32) para Date
+        if "data" in sql_columns:
+            frame = frame.with_columns(pl.col("data").cast(pl.Date))
         
         # Renomeia colunas para formato padronizado
-        df = df.rename({
-            "d1": "D1", "d2": "D2", "d3": "D3",
-            "d4": "D4", "d5": "D5", "d6": "D6",
-            "t1": "T1", "t2": "T2"
+        frame = frame.rename({
+            sql_col: col for col, sql_col in zip(columns, sql_columns)
+            if sql_col != col
         })
         
-        conn.close()
-        
-        return df
+        return frame
         
     except sqlite3.Error as e:
         raise sqlite3.Error(f"Erro ao acessar banco de dados: {e}")
+    except ValueError:
+        raise
     except Exception as e:
         raise Exception(f"Erro inesperado ao carregar dados: {e}")
 
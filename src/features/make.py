@@ -5,10 +5,84 @@ dos números sorteados, incluindo frequências, tendências temporais e
 padrões de aparição para uso em modelos de machine learning.
 """
 
+import numpy as np
 import polars as pl
 from typing import Optional
 
 
+# Colunas da matriz de aparições: dezenas 1-50 e depois trevos 1-6
+_GRID_NUMBERS = np.concatenate([np.arange(1, 51), np.arange(1, 7)]).astype(np.int64)
+_GRID_TIPOS = pl.Series('tipo', ['dezena'] * 50 + ['trevo'] * 6)
+
+
+def _appearance_matrix(df: pl.DataFrame):
+    """Matriz de aparições (concursos x 56) montada direto de D1-D6/T1-T2.
+    
+    Colunas 0-49 são as dezenas 1-50 e 50-55 os trevos 1-6; valores fora
+    do range não marcam aparição.
+    
+    Returns:
+        (concursos, appearances): concursos únicos em ordem crescente e
+        matriz int32 com 1 onde o número saiu no concurso da linha
+    """
+    concursos, row_idx = np.unique(df['concurso'].to_numpy(), return_inverse=True)
+    
+    appearances = np.zeros((len(concursos), 56), dtype=np.int32)
+    for cols, offset, n_max in (
+        (['D1', 'D2', 'D3', 'D4', 'D5', 'D6'], 0, 50),
+        (['T1', 'T2'], 50, 6),
+    ):
+        values = df.select(cols).fill_null(0).to_numpy().astype(np.int64)
+        valid = (values >= 1) & (values <= n_max)
+        rows = np.broadcast_to(row_idx[:, None], values.shape)
+        appearances[rows[valid], values[valid] - 1 + offset] = 1
+    
+    return concursos, appearances
+
+
+def _window_features(appearances):
+    """Features por coluna da matriz de aparições (N, 56).
+    
+    Returns:
+        (cum, roll10, roll25, momentum5, last_row): contagem acumulada,
+        janelas de 10 e 25, média dos últimos 5 (dos disponíveis, no início
+        da série) e linha da última aparição de cada coluna (-1 se nunca apareceu)
+    """
+    n_draws = appearances.shape[0]
+    cum = np.cumsum(appearances, axis=0, dtype=np.int32)
+    
+    def window(size):
+        previous = np.zeros_like(cum)
+        previous[size:] = cum[:-size]
+        return cum - previous
+    
+    counts = np.minimum(np.arange(1, n_draws + 1), 5)[:, None]
+    momentum5 = window(5) / counts
+    
+    seen = appearances.any(axis=0)
+    last_row = np.where(seen, n_draws - 1 - np.argmax(appearances[::-1], axis=0), -1)
+    
+    return cum, window(10), window(25), momentum5, last_row
+
+
+def _shift_grid(values, fill):
+    """Desloca uma matriz (N, 56) uma posição na ordem do grid longo.
+    
+    No grid (bloco de dezenas, depois bloco de trevos, cada um ordenado por
+    concurso e número) cada posição recebe o valor da anterior: equivale a
+    shift(1) na coluna inteira do grid, e não por número.
+    """
+    n_draws = values.shape[0]
+    flat = np.concatenate([values[:, :50].ravel(), values[:, 50:].ravel()])
+    shifted = np.empty_like(flat)
+    shifted[:1] = fill
+    shifted[1:] = flat[:-1]
+    return np.concatenate([
+        shifted[:n_draws * 50].reshape(n_draws, 50),
+        shifted[n_draws * 50:].reshape(n_draws, 6),
+    ], axis=1)
+
+
 def build_number_features(df: pl.DataFrame) -> pl.DataFrame:
     """Constrói features históricas para cada número em cada sorteio.
     
@@ -23,13 +97,13 @@ def build_number_features(df: pl.DataFrame) -> pl.DataFrame:
     Returns:
         pl.DataFrame: DataFrame com colunas:
             - concurso (int): Número do concurso
-            - n (int): Número analisado (1-50 para dezenas, 1-6 para trevos)
+            - n (UInt8): Número analisado (1-50 para dezenas, 1-6 para trevos)
             - tipo (str): 'dezena' ou 'trevo'
-            - freq_total (int): Frequência total até o concurso
-            - roll10 (int): Frequência nos últimos 10 sorteios
-            - roll25 (int): Frequência nos últimos 25 sorteios
-            - last_seen (int): Concursos desde última aparição
-            - momentum5 (float): Tendência nos últimos 5 sorteios
+            - freq_total (UInt16): Frequência total até o concurso
+            - roll10 (UInt8): Frequência nos últimos 10 sorteios
+            - roll25 (UInt8): Frequência nos últimos 25 sorteios
+            - last_seen (Int32): Concursos desde última aparição
+            - momentum5 (Float64): Tendência nos últimos 5 sorteios
             - y_next (bool): Se aparece no próximo sorteio
             
     Raises:
@@ -41,169 +115,78 @@ def build_number_features(df: pl.DataFrame) -> pl.DataFrame:
         >>> features = build_number_features(df)
         >>> print(f"Features geradas: {len(features)}")
     """
-    if df.is_empty():
+    if df.height == 0:
         raise ValueError("DataFrame não pode estar vazio")
     
+    # Verificações só nos metadados (schema), sem ler os dados
+    schema = df.schema
     required_cols = ['concurso', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-    missing_cols = [col for col in required_cols if col not in df.columns]
+    missing_cols = [col for col in required_cols if col not in schema]
     if missing_cols:
         raise ValueError(f"Colunas obrigatórias ausentes: {missing_cols}")
     
-    # Validação adicional para detectar dados corrompidos
-    try:
-        # Verificar se há valores não numéricos nas colunas de números
-        numeric_cols = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-        for col in numeric_cols:
-            if col in df.columns:
-                # Verificar se há strings problemáticas
-                sample_values = df[col].head(10).to_list()
-                for val in sample_values:
-                    if isinstance(val, str) and 'dezena' in val:
-                        raise ValueError(f"Dados corrompidos detectados na coluna '{col}': valor '{val}' contém 'dezena'")
-                    elif val is not None:
-                        try:
-                            float(val)
-                        except (ValueError, TypeError):
-                            if isinstance(val, str) and any(char.isalpha() for char in val):
-                                raise ValueError(f"Dados corrompidos na coluna '{col}': valor não numérico '{val}'")
-    except Exception as validation_error:
-        print(f"ERRO DE VALIDAÇÃO: {validation_error}")
-        raise validation_error
+    # Validação adicional para detectar dados corrompidos: as colunas de
+    # números precisam ser numéricas (texto como 'dezena' reprova pelo tipo)
+    for col in required_cols[1:]:
+        if not schema[col].is_numeric():
+            validation_error = ValueError(
+                f"Dados corrompidos na coluna '{col}': tipo {schema[col]} não numérico"
+            )
+            print(f"ERRO DE VALIDAÇÃO: {validation_error}")
+            raise validation_error
     
     # Ordena por concurso para garantir ordem cronológica
     df = df.sort('concurso')
     
-    # Converte dados para formato longo (unpivot)
-    dezenas_df = df.select([
-        'concurso',
-        pl.col(['D1', 'D2', 'D3', 'D4', 'D5', 'D6'])
-    ]).unpivot(
-        index='concurso',
-        on=['D1', 'D2', 'D3', 'D4', 'D5', 'D6'],
-        variable_name='pos',
-        value_name='n'
-    ).with_columns(
-        pl.lit('dezena').alias('tipo')
-    ).select(['concurso', 'n', 'tipo'])
-    
-    trevos_df = df.select([
-        'concurso',
-        pl.col(['T1', 'T2'])
-    ]).unpivot(
-        index='concurso',
-        on=['T1', 'T2'],
-        variable_name='pos',
-        value_name='n'
-    ).with_columns(
-        pl.lit('trevo').alias('tipo')
-    ).select(['concurso', 'n', 'tipo'])
-    
-    # Combina dezenas e trevos
-    long_df = pl.concat([dezenas_df, trevos_df])
-    
-    # Cria grid completo de (concurso, número, tipo)
-    concursos = df.select('concurso').unique().sort('concurso')
-    
-    # Grid para dezenas (1-50)
-    dezenas_grid = concursos.join(
-        pl.DataFrame({
-            'n': list(range(1, 51)),
-            'tipo': ['dezena'] * 50
-        }),
-        how='cross'
-    )
-    
-    # Grid para trevos (1-6)
-    trevos_grid = concursos.join(
-        pl.DataFrame({
-            'n': list(range(1, 7)),
-            'tipo': ['trevo'] * 6
-        }),
-        how='cross'
+    # Matriz indicadora (concursos x 56), sem unpivot nem joins
+    concursos, appearances = _appearance_matrix(df)
+    n_draws = len(concursos)
+    
+    # Features de cada número (coluna) em uma varredura: frequência
+    # acumulada, janelas de 10/25, média móvel de 5 e última aparição
+    cum, roll10, roll25, momentum5, last_row = _window_features(appearances)
+    
+    # Deslocamento de uma posição na ordem do grid longo (ver _shift_grid)
+    freq_total = _shift_grid(cum, 0)
+    roll10 = _shift_grid(roll10, 0)
+    roll25 = _shift_grid(roll25, 0)
+    momentum5 = _shift_grid(momentum5, 0.0)
+    
+    # last_seen: concurso menos o da última aparição do número em todo o
+    # histórico (999 se a frequência acumulada ainda é zero)
+    last_concurso = concursos[np.maximum(last_row, 0)]
+    last_seen = np.where(
+        (freq_total == 0) | (last_row < 0)[None, :],
+        999,
+        concursos[:, None].astype(np.int64) - last_concurso[None, :],
     )
     
-    # Grid completo
-    full_grid = pl.concat([dezenas_grid, trevos_grid])
-    
-    # Marca aparições (1 se apareceu, 0 caso contrário)
-    grid_with_appearances = full_grid.join(
-        long_df.with_columns(pl.lit(1).alias('apareceu')),
-        on=['concurso', 'n', 'tipo'],
-        how='left'
-    ).with_columns(
-        pl.col('apareceu').fill_null(0)
-    )
-    
-    # Calcula features por grupo (n, tipo)
-    features_df = grid_with_appearances.with_columns([
-        # Frequência total acumulada até o concurso atual (exclusive)
-        pl.col('apareceu').cum_sum().over(['n', 'tipo']).shift(1, fill_value=0).alias('freq_total'),
-        
-        # Rolling windows
-        pl.col('apareceu').rolling_sum(window_size=10, min_samples=1).over(['n', 'tipo']).shift(1, fill_value=0).alias('roll10'),
-        pl.col('apareceu').rolling_sum(window_size=25, min_samples=1).over(['n', 'tipo']).shift(1, fill_value=0).alias('roll25'),
-        
-        # Momentum (média móvel dos últimos 5)
-        pl.col('apareceu').rolling_mean(window_size=5, min_samples=1).over(['n', 'tipo']).shift(1, fill_value=0.0).alias('momentum5')
+    # y_next: se o número aparece no próximo sorteio
+    y_next = appearances[1:] == 1
+    
+    # Linhas do último concurso ficam de fora (não têm y_next válido); a
+    # ordem linha a linha da matriz já é (concurso, tipo, n)
+    keep = n_draws - 1
+    column_idx = np.tile(np.arange(56), keep)
+    concurso_dtype = df.schema['concurso']
+    
+    # Tipos estreitos para as contagens, limitadas pelo número de sorteios
+    # (cast estrito: estouro gera erro). last_seen é diferença de concursos,
+    # sem esse limite (gaps na numeração, negativo se a última aparição é
+    # posterior ao concurso): Int32, o mesmo tipo de concurso, sempre cabe.
+    # momentum5 fica em Float64 para não alterar a entrada do modelo
+    result = pl.DataFrame([
+        pl.Series('concurso', np.repeat(concursos[:keep], 56)).cast(concurso_dtype),
+        pl.Series('n', _GRID_NUMBERS[column_idx]).cast(pl.UInt8),
+        _GRID_TIPOS.gather(column_idx),
+        pl.Series('freq_total', freq_total[:keep].ravel()).cast(pl.UInt16),
+        pl.Series('roll10', roll10[:keep].ravel()).cast(pl.UInt8),
+        pl.Series('roll25', roll25[:keep].ravel()).cast(pl.UInt8),
+        pl.Series('last_seen', last_seen[:keep].ravel()).cast(pl.Int32),
+        pl.Series('momentum5', momentum5[:keep].ravel()),
+        pl.Series('y_next', y_next.ravel()),
     ])
     
-    # Calcula last_seen (concursos desde última aparição)
-    features_df = features_df.with_columns([
-        pl.when(pl.col('apareceu').shift(1, fill_value=0).over(['n', 'tipo']) == 1)
-        .then(0)
-        .otherwise(
-            pl.when(pl.col('freq_total') == 0)
-            .then(999)  # Nunca apareceu
-            .otherwise(
-                pl.col('concurso') - 
-                pl.col('concurso').filter(pl.col('apareceu') == 1).last().over(['n', 'tipo'])
-            )
-        ).alias('last_seen_temp')
-    ])
-    
-    # Calcula last_seen de forma mais robusta
-    features_df = features_df.with_columns([
-        pl.col('concurso').rank('ordinal').over(['n', 'tipo']).alias('rank_concurso')
-    ])
-    
-    # Para cada linha, encontra a última aparição anterior
-    features_df = features_df.with_columns([
-        pl.when(pl.col('freq_total') == 0)
-        .then(pl.col('rank_concurso') - 1)  # Nunca apareceu antes
-        .otherwise(
-            pl.col('rank_concurso') - 
-            pl.col('rank_concurso').filter(
-                (pl.col('apareceu') == 1) & 
-                (pl.col('rank_concurso') < pl.col('rank_concurso'))
-            ).max().over(['n', 'tipo']).fill_null(0) - 1
-        ).alias('last_seen')
-    ])
-    
-    # Simplifica cálculo de last_seen
-    features_df = features_df.with_columns([
-        pl.when(pl.col('freq_total') == 0)
-        .then(999)  # Nunca apareceu
-        .otherwise(
-            (pl.col('concurso') - 
-             pl.col('concurso').filter(pl.col('apareceu') == 1).last().over(['n', 'tipo'])).fill_null(999)
-        ).alias('last_seen')
-    ])
-    
-    # Adiciona y_next (se aparece no próximo sorteio)
-    features_df = features_df.with_columns([
-        pl.col('apareceu').shift(-1, fill_value=0).over(['n', 'tipo']).cast(pl.Boolean).alias('y_next')
-    ])
-    
-    # Remove linhas do último concurso (não têm y_next válido)
-    max_concurso = features_df.select(pl.col('concurso').max()).item()
-    features_df = features_df.filter(pl.col('concurso') < max_concurso)
-    
-    # Seleciona e ordena colunas finais
-    result = features_df.select([
-        'concurso', 'n', 'tipo', 'freq_total', 'roll10', 'roll25', 
-        'last_seen', 'momentum5', 'y_next'
-    ]).sort(['concurso', 'tipo', 'n'])
-    
     return result
 
 
@@ -237,110 +220,39 @@ def latest_feature_snapshot(df: pl.DataFrame) -> pl.DataFrame:
         >>> print(f"Dezenas únicas: {len(snapshot.filter(pl.col('tipo') == 'dezena'))}")
         >>> print(f"Trevos únicos: {len(snapshot.filter(pl.col('tipo') == 'trevo'))}")
     """
-    if df.is_empty():
+    if df.height == 0:
         raise ValueError("DataFrame não pode estar vazio")
     
     required_cols = ['concurso', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-    missing_cols = [col for col in required_cols if col not in df.columns]
+    missing_cols = [col for col in required_cols if col not in df.schema]
     if missing_cols:
         raise ValueError(f"Colunas obrigatórias ausentes: {missing_cols}")
     
-    # Ordena por concurso
-    df = df.sort('concurso')
-    
-    # Converte para formato longo
-    dezenas_df = df.select([
-        'concurso',
-        pl.col(['D1', 'D2', 'D3', 'D4', 'D5', 'D6'])
-    ]).unpivot(
-        index='concurso',
-        on=['D1', 'D2', 'D3', 'D4', 'D5', 'D6'],
-        variable_name='pos',
-        value_name='n'
-    ).with_columns(
-        pl.lit('dezena').alias('tipo')
-    ).select(['concurso', 'n', 'tipo'])
-    
-    trevos_df = df.select([
-        'concurso',
-        pl.col(['T1', 'T2'])
-    ]).unpivot(
-        index='concurso',
-        on=['T1', 'T2'],
-        variable_name='pos',
-        value_name='n'
-    ).with_columns(
-        pl.lit('trevo').alias('tipo')
-    ).select(['concurso', 'n', 'tipo'])
+    # Matriz de aparições: as janelas são por valor de concurso (concurso
+    # maior que o último menos a janela), somadas coluna a coluna
+    concursos, appearances = _appearance_matrix(df)
+    max_concurso = int(concursos[-1])
     
-    # Combina dezenas e trevos
-    long_df = pl.concat([dezenas_df, trevos_df])
+    def recent(window):
+        return appearances[concursos > max_concurso - window].sum(axis=0, dtype=np.int64)
     
-    # Cria grid para todos os números possíveis
-    dezenas_grid = pl.DataFrame({
-        'n': list(range(1, 51)),
-        'tipo': ['dezena'] * 50
-    })
+    freq_total = appearances.sum(axis=0, dtype=np.int64)
+    seen = freq_total > 0
+    last_row = len(concursos) - 1 - np.argmax(appearances[::-1], axis=0)
+    # Last seen (999 se nunca apareceu)
+    last_seen = np.where(seen, max_concurso - concursos[last_row].astype(np.int64), 999)
     
-    trevos_grid = pl.DataFrame({
-        'n': list(range(1, 7)),
-        'tipo': ['trevo'] * 6
-    })
-    
-    numbers_grid = pl.concat([dezenas_grid, trevos_grid])
-    
-    # Para cada número, calcula features baseadas em todo o histórico
-    snapshot_features = []
-    
-    for row in numbers_grid.iter_rows(named=True):
-        n = row['n']
-        tipo = row['tipo']
-        
-        # Filtra aparições deste número
-        appearances = long_df.filter(
-            (pl.col('n') == n) & (pl.col('tipo') == tipo)
-        ).sort('concurso')
-        
-        # Calcula features
-        freq_total = len(appearances)
-        
+    result = pl.DataFrame([
+        pl.Series('n', _GRID_NUMBERS),
+        _GRID_TIPOS,
+        pl.Series('freq_total', freq_total),
         # Rolling windows (últimos 10 e 25 sorteios)
-        max_concurso = df.select(pl.col('concurso').max()).item()
-        recent_10 = appearances.filter(
-            pl.col('concurso') > (max_concurso - 10)
-        )
-        recent_25 = appearances.filter(
-            pl.col('concurso') > (max_concurso - 25)
-        )
-        
-        roll10 = len(recent_10)
-        roll25 = len(recent_25)
-        
-        # Last seen
-        if freq_total == 0:
-            last_seen = 999  # Nunca apareceu
-        else:
-            last_appearance = appearances.select(pl.col('concurso').max()).item()
-            last_seen = max_concurso - last_appearance
-        
+        pl.Series('roll10', recent(10)),
+        pl.Series('roll25', recent(25)),
+        pl.Series('last_seen', last_seen),
         # Momentum (últimos 5 sorteios)
-        recent_5 = appearances.filter(
-            pl.col('concurso') > (max_concurso - 5)
-        )
-        momentum5 = len(recent_5) / 5.0
-        
-        snapshot_features.append({
-            'n': n,
-            'tipo': tipo,
-            'freq_total': freq_total,
-            'roll10': roll10,
-            'roll25': roll25,
-            'last_seen': last_seen,
-            'momentum5': momentum5
-        })
-    
-    # Converte para DataFrame
-    result = pl.DataFrame(snapshot_features).sort(['tipo', 'n'])
+        pl.Series('momentum5', recent(5) / 5.0),
+    ])
     
     return result
 
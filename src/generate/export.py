@@ -4,19 +4,131 @@ Este módulo fornece funcionalidades para exportar bilhetes gerados
 em formatos adequados para conferência e apostas.
 """
 
-import pandas as pd
+import csv
+import tempfile
+import numpy as np
+import openpyxl
+import polars as pl
 from pathlib import Path
-from typing import List, Tuple, Union
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
 
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
 
-def export_excel(tickets: List[Tuple], path: str = "outputs/jogos.xlsx") -> None:
+# A partir deste número de bilhetes o xlsxwriter (se instalado) é usado
+XLSXWRITER_MIN_ROWS = 1000
+
+# Bilhetes validados e gravados por bloco durante a exportação
+EXPORT_CHUNK_SIZE = 5000
+
+EXPORT_COLUMNS = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
+
+# Tabela de números formatados (índice = número): dezenas com dois dígitos
+_PAD2 = np.array([f"{n:02d}" for n in range(51)])
+_TREVO_STR = np.array([str(n) for n in range(7)])
+
+# Template de exibição de um bilhete padrão (dezenas com dois dígitos)
+_TICKET_FMT = '{:02d}-{:02d}-{:02d}-{:02d}-{:02d}-{:02d} + {}-{}'.format
+
+
+def _ticket_to_row(ticket: Tuple) -> List[int]:
+    """Valida um bilhete e o converte em linha [D1..D6, T1, T2]."""
+    if isinstance(ticket, tuple) and len(ticket) == 2:
+        dezenas, trevos = ticket
+    else:
+        raise ValueError(f"Formato de bilhete inválido: {ticket}. Esperado: (dezenas, trevos)")
+    
+    # Validar dezenas
+    if not isinstance(dezenas, (tuple, list)) or len(dezenas) != 6:
+        raise ValueError(f"Dezenas inválidas: {dezenas}. Esperado: 6 números")
+    
+    # Validar trevos
+    if not isinstance(trevos, (tuple, list)) or len(trevos) != 2:
+        raise ValueError(f"Trevos inválidos: {trevos}. Esperado: 2 números")
+    
+    # Converter para inteiros se necessário
+    try:
+        dezenas_int = [int(d) for d in dezenas]
+        trevos_int = [int(t) for t in trevos]
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Erro ao converter números: {e}")
+    
+    # Validar ranges
+    for d in dezenas_int:
+        if not (1 <= d <= 50):
+            raise ValueError(f"Dezena {d} fora do range válido (1-50)")
+    
+    for t in trevos_int:
+        if not (1 <= t <= 6):
+            raise ValueError(f"Trevo {t} fora do range válido (1-6)")
+    
+    return dezenas_int + trevos_int
+
+
+def _chunk_to_array(chunk: List[Tuple], check_ranges: bool = True) -> Optional[np.ndarray]:
+    """Converte um bloco de bilhetes numa matriz (N, 8), validando de uma vez.
+    
+    Retorna None se algum bilhete for inválido (formato, conversão ou
+    range): o chamador revalida o bloco bilhete a bilhete para gerar a
+    mensagem de erro exata.
+    """
+    if not all(
+        isinstance(ticket, tuple) and len(ticket) == 2
+        and isinstance(ticket[0], (tuple, list)) and len(ticket[0]) == 6
+        and isinstance(ticket[1], (tuple, list)) and len(ticket[1]) == 2
+        for ticket in chunk
+    ):
+        return None
+    
+    try:
+        arr = np.array([(*dezenas, *trevos) for dezenas, trevos in chunk], dtype=np.int64)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    
+    if check_ranges and ((arr < 1).any() or (arr[:, :6] > 50).any() or (arr[:, 6:] > 6).any()):
+        return None
+    
+    return arr
+
+
+def _iter_array_chunks(tickets: Iterable[Tuple],
+                       chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Valida os bilhetes e os entrega em matrizes (N, 8) de até chunk_size linhas."""
+    iterator = iter(tickets)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        arr = _chunk_to_array(chunk)
+        if arr is None:
+            # Bloco com bilhete inválido: _ticket_to_row levanta o erro
+            arr = np.array([_ticket_to_row(ticket) for ticket in chunk], dtype=np.int64)
+        yield arr
+
+
+def _iter_row_chunks(tickets: Iterable[Tuple],
+                     chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[List[int]]]:
+    """Valida os bilhetes e os entrega em blocos de até chunk_size linhas."""
+    for arr in _iter_array_chunks(tickets, chunk_size):
+        yield arr.tolist()
+
+
+def export_excel(tickets: List[Tuple], path: Union[str, Path, BinaryIO] = "outputs/jogos.xlsx") -> None:
     """
     Exporta bilhetes para arquivo Excel com formato padrão da +Milionária.
     
+    Os bilhetes são validados e gravados em blocos de EXPORT_CHUNK_SIZE,
+    mantendo o uso de memória constante mesmo para lotes grandes.
+    
     Args:
         tickets: Lista de bilhetes no formato [(dezenas, trevos), ...]
                 onde dezenas é uma tupla de 6 números e trevos uma tupla de 2 números
         path: Caminho do arquivo Excel de saída (padrão: "outputs/jogos.xlsx")
+              ou buffer binário (ex: io.BytesIO) para exportar em memória
     
     Formato de saída:
         - Colunas D1, D2, D3, D4, D5, D6 para as dezenas
@@ -30,71 +142,68 @@ def export_excel(tickets: List[Tuple], path: str = "outputs/jogos.xlsx") -> None
     if not tickets:
         raise ValueError("Lista de bilhetes não pode estar vazia")
     
-    # Criar diretório de saída se não existir
-    output_path = Path(path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Preparar dados para DataFrame
-    data = []
+    # Criar diretório de saída se não existir (buffers em memória não precisam)
+    if isinstance(path, (str, Path)):
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    for ticket in tickets:
-        if isinstance(ticket, tuple) and len(ticket) == 2:
-            dezenas, trevos = ticket
-        else:
-            raise ValueError(f"Formato de bilhete inválido: {ticket}. Esperado: (dezenas, trevos)")
-        
-        # Validar dezenas
-        if not isinstance(dezenas, (tuple, list)) or len(dezenas) != 6:
-            raise ValueError(f"Dezenas inválidas: {dezenas}. Esperado: 6 números")
-        
-        # Validar trevos
-        if not isinstance(trevos, (tuple, list)) or len(trevos) != 2:
-            raise ValueError(f"Trevos inválidos: {trevos}. Esperado: 2 números")
-        
-        # Converter para inteiros se necessário
-        try:
-            dezenas_int = [int(d) for d in dezenas]
-            trevos_int = [int(t) for t in trevos]
-        except (ValueError, TypeError) as e:
-            raise ValueError(f"Erro ao converter números: {e}")
-        
-        # Validar ranges
-        for d in dezenas_int:
-            if not (1 <= d <= 50):
-                raise ValueError(f"Dezena {d} fora do range válido (1-50)")
-        
-        for t in trevos_int:
-            if not (1 <= t <= 6):
-                raise ValueError(f"Trevo {t} fora do range válido (1-6)")
-        
-        # Adicionar linha aos dados
-        row = {
-            'D1': dezenas_int[0],
-            'D2': dezenas_int[1], 
-            'D3': dezenas_int[2],
-            'D4': dezenas_int[3],
-            'D5': dezenas_int[4],
-            'D6': dezenas_int[5],
-            'T1': trevos_int[0],
-            'T2': trevos_int[1]
-        }
-        data.append(row)
-    
-    # Criar DataFrame
-    df = pd.DataFrame(data)
-    
-    # Garantir ordem das colunas
-    columns_order = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-    df = df[columns_order]
-    
-    # Exportar para Excel
+    # Exportar para Excel: lotes grandes via xlsxwriter (mais rápido e gera
+    # arquivos menores); senão workbook write-only do openpyxl. Em ambos as
+    # linhas são gravadas direto, sem DataFrame nem formatação do pandas.
+    # Bilhete inválido gera ValueError antes de qualquer arquivo ser salvo
+    chunks = _iter_row_chunks(tickets)
     try:
-        df.to_excel(path, index=False, engine='openpyxl')
-        print(f"✅ {len(tickets)} bilhetes exportados para: {path}")
+        if XLSXWRITER_AVAILABLE and len(tickets) >= XLSXWRITER_MIN_ROWS:
+            _write_xlsxwriter(chunks, path)
+        else:
+            _write_openpyxl(chunks, path)
+        if isinstance(path, (str, Path)):
+            print(f"✅ {len(tickets)} bilhetes exportados para: {path}")
+    except ValueError:
+        raise
     except Exception as e:
         raise RuntimeError(f"Erro ao salvar arquivo Excel: {e}")
 
 
+def _write_openpyxl(chunks: Iterator[List[List[int]]], path: Union[str, Path, BinaryIO]) -> None:
+    """Grava os blocos de linhas com workbook write-only do openpyxl."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(EXPORT_COLUMNS)
+    try:
+        for chunk in chunks:
+            for row in chunk:
+                ws.append(row)
+    except ValueError:
+        # Descartar o workbook parcial sem salvá-lo
+        ws.close()
+        raise
+    wb.save(path)
+
+
+def _write_xlsxwriter(chunks: Iterator[List[List[int]]], path: Union[str, Path, BinaryIO]) -> None:
+    """Grava os blocos de linhas com xlsxwriter."""
+    # Temporários do xlsxwriter num diretório próprio, removido ao sair: em
+    # erro o workbook é descartado sem close() e nada fica para trás
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdir:
+        if isinstance(path, (str, Path)):
+            # constant_memory: cada linha vai para o disco assim que é escrita
+            workbook = xlsxwriter.Workbook(str(path), {'constant_memory': True, 'tmpdir': tmpdir})
+        else:
+            workbook = xlsxwriter.Workbook(path, {'in_memory': True, 'tmpdir': tmpdir})
+        
+        # O arquivo final só é montado em close(); em erro nada é salvo
+        worksheet = workbook.add_worksheet('Sheet1')
+        worksheet.write_row(0, 0, EXPORT_COLUMNS)
+        row_idx = 1
+        for chunk in chunks:
+            for row in chunk:
+                worksheet.write_row(row_idx, 0, row)
+                row_idx += 1
+        
+        workbook.close()
+
+
 def export_csv(tickets: List[Tuple], path: str = "outputs/jogos.csv") -> None:
     """
     Exporta bilhetes para arquivo CSV.
@@ -110,34 +219,102 @@ def export_csv(tickets: List[Tuple], path: str = "outputs/jogos.csv") -> None:
     output_path = Path(path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Reutilizar lógica do Excel mas salvar como CSV
-    data = []
-    
-    for ticket in tickets:
-        if isinstance(ticket, tuple) and len(ticket) == 2:
-            dezenas, trevos = ticket
-        else:
-            raise ValueError(f"Formato de bilhete inválido: {ticket}")
-        
-        dezenas_int = [int(d) for d in dezenas]
-        trevos_int = [int(t) for t in trevos]
+    # Linhas escritas direto com csv.writer, sem montar DataFrame
+    try:
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(EXPORT_COLUMNS)
+            
+            # Gravar em blocos de EXPORT_CHUNK_SIZE linhas
+            iterator = iter(tickets)
+            while True:
+                chunk = list(islice(iterator, EXPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                arr = _chunk_to_array(chunk, check_ranges=False)
+                if arr is not None:
+                    writer.writerows(arr.tolist())
+                    continue
+                # Formato fora do padrão 6+2: conversão bilhete a bilhete
+                rows = []
+                for ticket in chunk:
+                    if isinstance(ticket, tuple) and len(ticket) == 2:
+                        dezenas, trevos = ticket
+                    else:
+                        raise ValueError(f"Formato de bilhete inválido: {ticket}")
+                    rows.append([int(d) for d in dezenas] + [int(t) for t in trevos])
+                writer.writerows(rows)
         
-        row = {
-            'D1': dezenas_int[0], 'D2': dezenas_int[1], 'D3': dezenas_int[2],
-            'D4': dezenas_int[3], 'D5': dezenas_int[4], 'D6': dezenas_int[5],
-            'T1': trevos_int[0], 'T2': trevos_int[1]
-        }
-        data.append(row)
+        print(f"✅ {len(tickets)} bilhetes exportados para: {path}")
+    except ValueError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Erro ao salvar arquivo CSV: {e}")
+
+
+def _tickets_frame(tickets: List[Tuple]) -> pl.DataFrame:
+    """Bilhetes validados num DataFrame Polars (colunas D1..T2, UInt8)."""
+    arr = np.concatenate(list(_iter_array_chunks(tickets)))
+    return pl.from_numpy(arr.astype(np.uint8), schema=EXPORT_COLUMNS)
+
+
+def export_parquet(tickets: List[Tuple], path: str = "outputs/jogos.parquet",
+                   compression: str = "snappy") -> None:
+    """
+    Exporta bilhetes para arquivo Parquet.
     
-    df = pd.DataFrame(data)
-    columns_order = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'T1', 'T2']
-    df = df[columns_order]
+    Formato colunar binário, menor que o CSV e lido direto por Polars/Arrow
+    (pl.read_parquet) sem conversão de texto. Mesmas colunas e validação
+    de export_excel.
+    
+    Args:
+        tickets: Lista de bilhetes no formato [(dezenas, trevos), ...]
+        path: Caminho do arquivo Parquet de saída
+        compression: Compressão do Parquet (padrão: "snappy")
+    """
+    if not tickets:
+        raise ValueError("Lista de bilhetes não pode estar vazia")
+    
+    # Criar diretório de saída se não existir
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     
     try:
-        df.to_csv(path, index=False)
+        _tickets_frame(tickets).write_parquet(output_path, compression=compression)
         print(f"✅ {len(tickets)} bilhetes exportados para: {path}")
+    except ValueError:
+        raise
     except Exception as e:
-        raise RuntimeError(f"Erro ao salvar arquivo CSV: {e}")
+        raise RuntimeError(f"Erro ao salvar arquivo Parquet: {e}")
+
+
+def export_feather(tickets: List[Tuple], path: str = "outputs/jogos.feather",
+                   compression: str = "lz4") -> None:
+    """
+    Exporta bilhetes para arquivo Feather (Arrow IPC).
+    
+    Leitura de volta mais rápida que o Parquet (pl.read_ipc, com mapeamento
+    em memória). Mesmas colunas e validação de export_excel.
+    
+    Args:
+        tickets: Lista de bilhetes no formato [(dezenas, trevos), ...]
+        path: Caminho do arquivo Feather de saída
+        compression: Compressão do arquivo (padrão: "lz4")
+    """
+    if not tickets:
+        raise ValueError("Lista de bilhetes não pode estar vazia")
+    
+    # Criar diretório de saída se não existir
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        _tickets_frame(tickets).write_ipc(output_path, compression=compression)
+        print(f"✅ {len(tickets)} bilhetes exportados para: {path}")
+    except ValueError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Erro ao salvar arquivo Feather: {e}")
 
 
 def format_ticket_display(ticket: Tuple) -> str:
@@ -159,10 +336,53 @@ def format_ticket_display(ticket: Tuple) -> str:
     else:
         raise ValueError(f"Formato de bilhete inválido: {ticket}")
     
+    # Bilhete padrão (6 dezenas + 2 trevos): um único format pré-compilado
+    if len(dezenas) == 6 and len(trevos) == 2:
+        return _TICKET_FMT(*map(int, dezenas), *map(int, trevos))
+    
     # Formatar dezenas com zero à esquerda
     dezenas_str = '-'.join([f"{int(d):02d}" for d in dezenas])
     
     # Formatar trevos
     trevos_str = '-'.join([str(int(t)) for t in trevos])
     
-    return f"{dezenas_str} + {trevos_str}"
\ No newline at end of file
+    return f"{dezenas_str} + {trevos_str}"
+
+
+def format_tickets_display(tickets: List[Tuple]) -> List[str]:
+    """
+    Formata vários bilhetes para exibição de uma só vez (vetorizado).
+    
+    Equivalente a chamar format_ticket_display em cada bilhete, mas monta as
+    strings coluna a coluna com operações de string do NumPy.
+    
+    Args:
+        tickets: Lista de bilhetes no formato [(dezenas, trevos), ...]
+                 com dezenas entre 1-50 e trevos entre 1-6
+    
+    Returns:
+        Lista de strings formatadas, na mesma ordem dos bilhetes
+    
+    Example:
+        >>> format_tickets_display([((5, 10, 15, 20, 25, 30), (2, 5))])
+        ['05-10-15-20-25-30 + 2-5']
+    """
+    if not tickets:
+        return []
+    
+    dezenas = np.asarray([d for d, _ in tickets], dtype=np.int64)
+    trevos = np.asarray([t for _, t in tickets], dtype=np.int64)
+    
+    # Dezenas com zero à esquerda, trevos sem (consulta às tabelas pré-formatadas)
+    dezenas_str = _PAD2[dezenas]
+    trevos_str = _TREVO_STR[trevos]
+    
+    result = dezenas_str[:, 0]
+    for j in range(1, dezenas_str.shape[1]):
+        result = np.char.add(np.char.add(result, '-'), dezenas_str[:, j])
+    
+    result = np.char.add(np.char.add(result, ' + '), trevos_str[:, 0])
+    for j in range(1, trevos_str.shape[1]):
+        result = np.char.add(np.char.add(result, '-'), trevos_str[:, j])
+    
+    return result.tolist()
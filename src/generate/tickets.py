@@ -4,8 +4,11 @@ Este módulo gera combinações plausíveis de números usando scores calculados
 pelo módulo de scoring, aplicando filtros estatísticos e estratégias para trevos.
 """
 
+import copy
+import os
 import random
 import numpy as np
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional, Set
 from itertools import combinations
 import yaml
@@ -127,46 +130,40 @@ def apply_filters(
         >>> len(filtered) <= len(tickets)
         True
     """
-    filtered_tickets = []
+    if not tickets:
+        return []
     
-    for ticket in tickets:
-        # Calcular estatísticas do ticket
-        ticket_sum = sum(ticket)
-        even_count = sum(1 for num in ticket if num % 2 == 0)
-        spread = max(ticket) - min(ticket)
-        
-        # Aplicar filtros
-        passes_filters = True
-        
-        # Filtro de soma mínima
-        if 'min_sum' in filters_dict:
-            if ticket_sum < filters_dict['min_sum']:
-                passes_filters = False
-        
-        # Filtro de soma máxima
-        if 'max_sum' in filters_dict:
-            if ticket_sum > filters_dict['max_sum']:
-                passes_filters = False
-        
-        # Filtro de números pares mínimos
-        if 'min_even' in filters_dict:
-            if even_count < filters_dict['min_even']:
-                passes_filters = False
-        
-        # Filtro de números pares máximos
-        if 'max_even' in filters_dict:
-            if even_count > filters_dict['max_even']:
-                passes_filters = False
-        
-        # Filtro de spread máximo
-        if 'max_spread' in filters_dict:
-            if spread > filters_dict['max_spread']:
-                passes_filters = False
-        
-        if passes_filters:
-            filtered_tickets.append(ticket)
+    # Estatísticas de todos os tickets de uma vez (matriz N x k)
+    arr = np.asarray(tickets, dtype=np.int64)
+    ticket_sum = arr.sum(axis=1)
+    even_count = (arr % 2 == 0).sum(axis=1)
+    spread = arr.max(axis=1) - arr.min(axis=1)
+    
+    # Aplicar filtros
+    passes_filters = np.ones(len(tickets), dtype=bool)
     
-    return filtered_tickets
+    # Filtro de soma mínima
+    if 'min_sum' in filters_dict:
+        passes_filters &= ticket_sum >= filters_dict['min_sum']
+    
+    # Filtro de soma máxima
+    if 'max_sum' in filters_dict:
+        passes_filters &= ticket_sum <= filters_dict['max_sum']
+    
+    # Filtro de números pares mínimos
+    if 'min_even' in filters_dict:
+        passes_filters &= even_count >= filters_dict['min_even']
+    
+    # Filtro de números pares máximos
+    if 'max_even' in filters_dict:
+        passes_filters &= even_count <= filters_dict['max_even']
+    
+    # Filtro de spread máximo
+    if 'max_spread' in filters_dict:
+        passes_filters &= spread <= filters_dict['max_spread']
+    
+    # Manter os tickets originais, na ordem de entrada
+    return [tickets[i] for i in np.flatnonzero(passes_filters)]
 
 
 def assign_trevos(
@@ -241,6 +238,9 @@ def load_filters_config(config_path: str = "configs/filters.yaml") -> Dict:
     """
     Carrega configuração de filtros do arquivo YAML.
     
+    O YAML parseado fica em cache por (caminho, mtime): chamadas seguintes
+    custam só um stat enquanto o arquivo não muda.
+    
     Args:
         config_path: Caminho para o arquivo de configuração
         
@@ -248,9 +248,9 @@ def load_filters_config(config_path: str = "configs/filters.yaml") -> Dict:
         Dicionário com configurações de filtros
     """
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config
+        mtime = os.path.getmtime(config_path)
+        # Cópia para que alterações do chamador não contaminem o cache
+        return copy.deepcopy(_load_filters_config_cached(str(config_path), mtime))
     except FileNotFoundError:
         print(f"Arquivo {config_path} não encontrado, usando configuração padrão")
         return get_default_config()
@@ -259,6 +259,13 @@ def load_filters_config(config_path: str = "configs/filters.yaml") -> Dict:
         return get_default_config()
 
 
+@lru_cache(maxsize=8)
+def _load_filters_config_cached(config_path: str, mtime: float) -> Dict:
+    """Leitura do YAML memoizada por (caminho, mtime do arquivo)."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
 def get_default_config() -> Dict:
     """
     Retorna configuração padrão de filtros.
@@ -306,7 +313,7 @@ if __name__ == "__main__":
     df = load_draws("db/milionaria.db")
     features = build_number_features(df)
     snapshot = latest_feature_snapshot(df)
-    model, scaler, weights = learn_weights_ridge(features)
+    model, scaler, weights, r2_train = learn_weights_ridge(features)
     scores = score_numbers(snapshot, weights)
     
     print(f"Scores calculados para {len(scores)} números")
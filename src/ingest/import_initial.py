@@ -165,7 +165,8 @@ def main():
         
         # 3. Importa os dados
         print("\nImportando dados para o banco...")
-        rows_affected = upsert_rows(df)
+        # Carga inicial em lote: refeita do zero se for interrompida
+        rows_affected = upsert_rows(df, fast=True)
         
         # 4. Verifica o resultado
         from src.db.io import read_max_concurso
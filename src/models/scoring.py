@@ -12,12 +12,24 @@ from typing import Dict, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# Features usadas no treino e no score, na ordem dos coeficientes do modelo
+FEATURE_COLUMNS = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
+
+# Pesos default: fallback sem treino e 30% do blend com o modelo
+DEFAULT_WEIGHTS = {
+    'freq_total': 0.3,
+    'roll10': 0.25,
+    'roll25': 0.2,
+    'last_seen': -0.15,  # Sinal invertido: quanto maior, menor o score
+    'momentum5': 0.2
+}
+
 
 def learn_weights_ridge(
     history_feats: pl.DataFrame,
     alpha: float = 1.0,
     random_state: int = 42
-) -> Tuple[Ridge, StandardScaler, Dict[str, float]]:
+) -> Tuple[Ridge, StandardScaler, Dict[str, float], float]:
     """
     Aprende pesos das features usando Ridge regression.
     
@@ -31,25 +43,20 @@ def learn_weights_ridge(
         - modelo Ridge treinado
         - scaler para normalização
         - pesos default como fallback
+        - R² do modelo nos dados de treino (0.0 se não houver treino)
         
     Example:
         >>> from src.etl.from_db import load_draws
         >>> from src.features.make import build_number_features
         >>> df = load_draws("db/milionaria.db")
         >>> features = build_number_features(df)
-        >>> model, scaler, defaults = learn_weights_ridge(features)
+        >>> model, scaler, defaults, r2_train = learn_weights_ridge(features)
     """
-    # Pesos default como fallback
-    default_weights = {
-        'freq_total': 0.3,
-        'roll10': 0.25,
-        'roll25': 0.2,
-        'last_seen': -0.15,  # Sinal invertido: quanto maior, menor o score
-        'momentum5': 0.2
-    }
+    # Pesos default como fallback (cópia: o chamador pode alterá-la)
+    default_weights = dict(DEFAULT_WEIGHTS)
     
     # Preparar dados para treinamento
-    feature_cols = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
+    feature_cols = FEATURE_COLUMNS
     
     # Filtrar apenas dados com y_next válido
     train_data = history_feats.filter(pl.col('y_next').is_not_null())
@@ -59,11 +66,12 @@ def learn_weights_ridge(
         # Retorna modelo dummy
         model = Ridge(alpha=alpha, random_state=random_state)
         scaler = StandardScaler()
-        return model, scaler, default_weights
+        return model, scaler, default_weights, 0.0
     
     # Extrair features e target
     X = train_data.select(feature_cols).to_numpy()
-    y = train_data.select('y_next').to_numpy().ravel().astype(int)
+    # Série 1D direto para NumPy (sem select 2D + ravel + cópia do astype)
+    y = train_data.get_column('y_next').cast(pl.Int64).to_numpy()
     
     # Normalizar features
     scaler = StandardScaler()
@@ -82,10 +90,12 @@ def learn_weights_ridge(
         default_w = default_weights.get(feature, 0.0)
         blended_weights[feature] = 0.7 * learned_w + 0.3 * default_w
     
+    r2_train = model.score(X_scaled, y)
+    
     print(f"Modelo treinado com {len(train_data)} amostras")
-    print(f"Score R² do modelo: {model.score(X_scaled, y):.4f}")
+    print(f"Score R² do modelo: {r2_train:.4f}")
     
-    return model, scaler, blended_weights
+    return model, scaler, blended_weights, r2_train
 
 
 def score_numbers(
@@ -121,7 +131,7 @@ def score_numbers(
     
     # Calcular score para cada dezena
     scores = {}
-    feature_cols = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
+    feature_cols = FEATURE_COLUMNS
     
     for row in dezenas_snapshot.iter_rows(named=True):
         numero = int(row['n'])
@@ -219,7 +229,7 @@ if __name__ == "__main__":
     
     # Treinar modelo
     print("\n=== Treinando Modelo Ridge ===")
-    model, scaler, weights = learn_weights_ridge(features)
+    model, scaler, weights, r2_train = learn_weights_ridge(features)
     
     print("\nPesos aprendidos (blended):")
     for feature, weight in weights.items():
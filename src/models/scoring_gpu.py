@@ -294,7 +294,7 @@ def get_pipeline_instructions() -> str:
     
     2. Substituir chamadas de função:
        # De:
-       model, scaler, weights = learn_weights_ridge(features)
+       model, scaler, weights, r2_train = learn_weights_ridge(features)
        scores = score_numbers(snapshot, weights)
        
        # Para:
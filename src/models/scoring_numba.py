@@ -0,0 +1,129 @@
+"""Módulo para scoring de números da +Milionária com Ridge em forma fechada (Numba).
+
+Alternativa a scoring.learn_weights_ridge para a opção --fast-ridge da CLI.
+Com poucas features (5), o ajuste do Ridge é dominado pelo overhead de
+validação do sklearn; aqui padronização, solução de (XᵀX + αI)w = Xᵀy e R²
+rodam num único kernel compilado. Sem Numba, o mesmo código roda em NumPy.
+"""
+
+import numpy as np
+import polars as pl
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+from typing import Dict, Tuple
+
+from .scoring import DEFAULT_WEIGHTS, FEATURE_COLUMNS
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _ridge_fit_kernel(X, y, alpha):
+    """Padroniza X e resolve o Ridge com intercepto em forma fechada.
+
+    Returns:
+        (mean, scale, coef, intercept, r2) no mesmo formato do par
+        StandardScaler + Ridge do sklearn
+    """
+    n, p = X.shape
+
+    mean = np.zeros(p)
+    scale = np.ones(p)
+    for j in range(p):
+        mean[j] = X[:, j].sum() / n
+        var = ((X[:, j] - mean[j]) ** 2).sum() / n
+        if var > 0.0:
+            scale[j] = np.sqrt(var)
+
+    X_scaled = (X - mean) / scale
+
+    # Colunas padronizadas têm média zero: basta centralizar y
+    y_mean = y.sum() / n
+    y_centered = y - y_mean
+
+    A = X_scaled.T @ X_scaled + alpha * np.eye(p)
+    b = X_scaled.T @ y_centered
+    coef = np.linalg.solve(A, b)
+
+    residual = y_centered - X_scaled @ coef
+    ss_res = (residual ** 2).sum()
+    ss_tot = (y_centered ** 2).sum()
+    r2 = 1.0 - ss_res / ss_tot if ss_tot != 0.0 else 0.0
+
+    return mean, scale, coef, y_mean, r2
+
+
+if NUMBA_AVAILABLE:
+    _ridge_fit_kernel = njit(cache=True)(_ridge_fit_kernel)
+
+
+def learn_weights_ridge(
+    history_feats: pl.DataFrame,
+    alpha: float = 1.0,
+    random_state: int = 42
+) -> Tuple[Ridge, StandardScaler, Dict[str, float], float]:
+    """
+    Aprende pesos das features com Ridge em forma fechada (Numba quando disponível).
+
+    Mesma interface e resultado de scoring.learn_weights_ridge: o modelo e o
+    scaler devolvidos são objetos do sklearn preenchidos com os parâmetros
+    ajustados, utilizáveis em predict/transform.
+
+    Args:
+        history_feats: DataFrame com features históricas incluindo y_next
+        alpha: Parâmetro de regularização do Ridge
+        random_state: Seed para reprodutibilidade (mantido pela interface;
+            a solução fechada é determinística)
+
+    Returns:
+        Tuple contendo:
+        - modelo Ridge treinado
+        - scaler para normalização
+        - pesos blended (70% modelo, 30% default)
+        - R² do modelo nos dados de treino (0.0 se não houver treino)
+    """
+    # Pesos default como fallback (cópia: o chamador pode alterá-la)
+    default_weights = dict(DEFAULT_WEIGHTS)
+    feature_cols = FEATURE_COLUMNS
+
+    # Filtrar apenas dados com y_next válido
+    train_data = history_feats.filter(pl.col('y_next').is_not_null())
+
+    if len(train_data) == 0:
+        print("Aviso: Nenhum dado de treino disponível, usando pesos default")
+        model = Ridge(alpha=alpha, random_state=random_state)
+        scaler = StandardScaler()
+        return model, scaler, default_weights, 0.0
+
+    X = np.ascontiguousarray(train_data.select(feature_cols).to_numpy(), dtype=np.float64)
+    y = train_data.get_column('y_next').cast(pl.Float64).to_numpy()
+
+    mean, scale, coef, intercept, r2_train = _ridge_fit_kernel(X, y, float(alpha))
+
+    # Objetos do sklearn com os parâmetros ajustados
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.scale_ = scale
+    scaler.var_ = scale ** 2
+    scaler.n_features_in_ = X.shape[1]
+    scaler.n_samples_seen_ = X.shape[0]
+
+    model = Ridge(alpha=alpha, random_state=random_state)
+    model.coef_ = coef
+    model.intercept_ = float(intercept)
+    model.n_features_in_ = X.shape[1]
+
+    # Blend com pesos default (70% modelo, 30% default)
+    blended_weights = {
+        feature: 0.7 * w + 0.3 * default_weights[feature]
+        for feature, w in zip(feature_cols, coef)
+    }
+    r2_train = float(r2_train)
+
+    print(f"Modelo treinado com {len(train_data)} amostras")
+    print(f"Score R² do modelo: {r2_train:.4f}")
+
+    return model, scaler, blended_weights, r2_train
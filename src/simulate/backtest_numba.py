@@ -0,0 +1,154 @@
+"""Módulo de backtest in-process usando Numba para avaliação de bilhetes.
+
+Alternativa ao backtest paralelo por processos para lotes pequenos, onde o
+custo de iniciar workers e serializar o histórico domina o tempo total.
+Cada bilhete e cada sorteio viram uma máscara de bits (bit n = número n) e
+os acertos são o popcount da interseção das máscaras.
+"""
+
+import numpy as np
+import polars as pl
+from collections import defaultdict
+from typing import List, Tuple, Dict, Any
+
+from src.simulate.backtest_ray import calculate_score
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, inline='always')
+    def _popcount64(x):
+        """Conta bits ligados de um uint64 (SWAR)."""
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+    # Compilado na primeira chamada (importar o módulo não paga o JIT); com
+    # cache=True as execuções seguintes carregam a versão de __pycache__
+    @njit(parallel=True, cache=True)
+    def _hit_matrix_kernel(ticket_masks, draw_masks):
+        """Matriz (T, D) de acertos entre máscaras de bilhetes e sorteios."""
+        n_tickets = ticket_masks.shape[0]
+        n_draws = draw_masks.shape[0]
+        hits = np.empty((n_tickets, n_draws), dtype=np.int8)
+        for d in prange(n_draws):
+            draw_mask = draw_masks[d]
+            for t in range(n_tickets):
+                hits[t, d] = _popcount64(ticket_masks[t] & draw_mask)
+        return hits
+
+
+def _to_masks(numbers: np.ndarray) -> np.ndarray:
+    """Converte uma matriz (N, k) de números em N máscaras uint64."""
+    bits = np.left_shift(np.uint64(1), numbers.astype(np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def compute_hits(tickets_i8: np.ndarray, draws_i8: np.ndarray) -> np.ndarray:
+    """Calcula a matriz de acertos entre bilhetes e sorteios.
+
+    Args:
+        tickets_i8: Matriz np.int8 (T, k) com os números de cada bilhete
+        draws_i8: Matriz np.int8 (D, k) com os números de cada sorteio
+
+    Returns:
+        Matriz np.int8 (T, D) com o número de acertos por par bilhete/sorteio
+    """
+    ticket_masks = _to_masks(tickets_i8)
+    draw_masks = _to_masks(draws_i8)
+
+    if NUMBA_AVAILABLE:
+        return _hit_matrix_kernel(ticket_masks, draw_masks)
+
+    # Fallback NumPy: interseção por broadcasting
+    matches = tickets_i8[:, None, :, None] == draws_i8[None, :, None, :]
+    return matches.sum(axis=(2, 3), dtype=np.int8)
+
+
+def run_backtest_numba(tickets: List[Tuple[Tuple[int, ...], Tuple[int, int]]],
+                       historical_data: pl.DataFrame) -> List[Dict[str, Any]]:
+    """Executa backtest in-process com o kernel Numba.
+
+    Produz os mesmos campos de run_backtest_parallel, sem criar processos.
+
+    Args:
+        tickets: Lista de bilhetes para avaliar
+        historical_data: DataFrame com dados históricos
+
+    Returns:
+        Lista de resultados ordenados por score
+    """
+    if not tickets:
+        return []
+
+    tickets_dez = np.array([dezenas for dezenas, _ in tickets], dtype=np.int8)
+    tickets_trev = np.array([trevos for _, trevos in tickets], dtype=np.int8)
+    draws_dez = historical_data.select([f'D{i}' for i in range(1, 7)]).to_numpy().astype(np.int8)
+    draws_trev = historical_data.select(['T1', 'T2']).to_numpy().astype(np.int8)
+
+    hits_dez = compute_hits(tickets_dez, draws_dez)
+    hits_trev = compute_hits(tickets_trev, draws_trev)
+
+    concursos = historical_data['concurso'].to_list()
+    if 'data' in historical_data.columns:
+        datas = historical_data['data'].to_list()
+    else:
+        datas = ['N/A'] * len(concursos)
+    num_draws = len(concursos)
+
+    results = []
+    for i, (dezenas, trevos) in enumerate(tickets):
+        row_dez = hits_dez[i]
+        row_trev = hits_trev[i]
+
+        total_dez = int(row_dez.sum())
+        total_trev = int(row_trev.sum())
+
+        dist_dez = defaultdict(int)
+        for hits, count in enumerate(np.bincount(row_dez, minlength=1)):
+            if count:
+                dist_dez[hits] = int(count)
+        dist_trev = defaultdict(int)
+        for hits, count in enumerate(np.bincount(row_trev, minlength=1)):
+            if count:
+                dist_trev[hits] = int(count)
+
+        # Sorteios com acertos significativos
+        winning_idx = np.flatnonzero((row_dez >= 3) | (row_trev >= 1))
+        winning_draws = [
+            {
+                'concurso': concursos[j],
+                'hits_dezenas': int(row_dez[j]),
+                'hits_trevos': int(row_trev[j]),
+                'data': datas[j]
+            }
+            for j in winning_idx
+        ]
+
+        ticket_result = {
+            'ticket_id': i,
+            'dezenas': dezenas,
+            'trevos': trevos,
+            'total_hits_dezenas': total_dez,
+            'total_hits_trevos': total_trev,
+            'max_hits_dezenas': int(row_dez.max()) if num_draws > 0 else 0,
+            'max_hits_trevos': int(row_trev.max()) if num_draws > 0 else 0,
+            'hit_distribution_dezenas': dist_dez,
+            'hit_distribution_trevos': dist_trev,
+            'winning_draws': winning_draws,
+            'avg_hits_dezenas': total_dez / num_draws if num_draws > 0 else 0,
+            'avg_hits_trevos': total_trev / num_draws if num_draws > 0 else 0
+        }
+        ticket_result['score'] = calculate_score(ticket_result)
+        results.append(ticket_result)
+
+    # Ordenar por score
+    results.sort(key=lambda x: x['score'], reverse=True)
+
+    return results
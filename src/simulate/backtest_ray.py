@@ -222,7 +222,7 @@ if __name__ == "__main__":
     # Gerar alguns bilhetes para teste
     features = build_number_features(df)
     snapshot = latest_feature_snapshot(df)
-    model, scaler, weights = learn_weights_ridge(features)
+    model, scaler, weights, r2_train = learn_weights_ridge(features)
     scores = score_numbers(snapshot, weights)
     
     config = load_filters_config("configs/filters.yaml")
@@ -137,32 +137,35 @@ def walk_forward_validation(
                     train_data, 
                     use_gpu=True
                 )
+                model_r2_value = None
             else:
-                model, scaler, weights = learn_weights_ridge(
+                # O R² de treino já vem calculado pelo Ridge
+                model, scaler, weights, model_r2_value = learn_weights_ridge(
                     train_data
                 )
                 
-            # Calcular R² do modelo (se disponível)
-            model_r2 = getattr(model, 'score', lambda x, y: 0.0)
-            if callable(model_r2):
-                try:
-                    # Tentar calcular R² nos dados de treino
-                    feature_cols = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
-                    train_features = train_data.filter(pl.col('y_next').is_not_null())
-                    if len(train_features) > 0:
-                        X_train = train_features.select(feature_cols).to_numpy()
-                        y_train = train_features.select('y_next').to_numpy().ravel()
-                        if hasattr(scaler, 'transform'):
-                            X_train_scaled = scaler.transform(X_train)
-                            model_r2_value = model.score(X_train_scaled, y_train)
+            # Calcular R² do modelo (se ainda não disponível)
+            if model_r2_value is None:
+                model_r2 = getattr(model, 'score', lambda x, y: 0.0)
+                if callable(model_r2):
+                    try:
+                        # Tentar calcular R² nos dados de treino
+                        feature_cols = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
+                        train_features = train_data.filter(pl.col('y_next').is_not_null())
+                        if len(train_features) > 0:
+                            X_train = train_features.select(feature_cols).to_numpy()
+                            y_train = train_features.select('y_next').to_numpy().ravel()
+                            if hasattr(scaler, 'transform'):
+                                X_train_scaled = scaler.transform(X_train)
+                                model_r2_value = model.score(X_train_scaled, y_train)
+                            else:
+                                model_r2_value = 0.0
                         else:
                             model_r2_value = 0.0
-                    else:
+                    except:
                         model_r2_value = 0.0
-                except:
+                else:
                     model_r2_value = 0.0
-            else:
-                model_r2_value = 0.0
                 
         except Exception as e:
             if verbose:
@@ -75,8 +75,8 @@ class CaixaFetcher:
         """Carrega a página inicial da +Milionária."""
         try:
             logger.info(f"Carregando página: {CAIXA_MILIONARIA_URL}")
+            # networkidle já aguarda o carregamento completo
             await self.page.goto(CAIXA_MILIONARIA_URL, wait_until="networkidle")
-            await asyncio.sleep(2)  # Aguarda carregamento completo
             logger.info("Página carregada com sucesso")
         except Exception as e:
             logger.error(f"Erro ao carregar página: {e}")
@@ -221,8 +221,6 @@ class CaixaFetcher:
                 if not await self._navigate('prev'):
                     print(f"Não foi possível navegar para concurso anterior")
                     break
-            
-            await asyncio.sleep(1)
         
         return False
     
@@ -261,10 +259,8 @@ class CaixaFetcher:
             max_iterations = 1000  # Limite de segurança
             
             for i in range(max_iterations):
-                # Tenta navegar para próximo
+                # Tenta navegar para próximo (_navigate já aguarda o carregamento)
                 if await self._navigate('next'):
-                    await asyncio.sleep(2)
-                    
                     # Coleta dados do novo concurso
                     next_data = await self._get_current_data()
                     
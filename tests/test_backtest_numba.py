@@ -0,0 +1,80 @@
+"""Testes de paridade entre o backtest Numba e o backtest paralelo."""
+
+import pytest
+import numpy as np
+import polars as pl
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.simulate import backtest_numba
+from src.simulate.backtest_numba import run_backtest_numba
+from src.simulate.backtest_ray import run_backtest_parallel
+
+
+class TestBacktestNumbaParity:
+    """run_backtest_numba deve produzir os mesmos resultados de run_backtest_parallel."""
+
+    @pytest.fixture
+    def historical_data(self):
+        """Histórico sintético de sorteios gerado com seed fixa."""
+        rng = np.random.default_rng(42)
+        n_draws = 120
+        dezenas = np.sort(
+            np.array([rng.choice(np.arange(1, 51), 6, replace=False) for _ in range(n_draws)]),
+            axis=1,
+        )
+        trevos = np.sort(
+            np.array([rng.choice(np.arange(1, 7), 2, replace=False) for _ in range(n_draws)]),
+            axis=1,
+        )
+        return pl.DataFrame({
+            'concurso': np.arange(1, n_draws + 1),
+            'data': [f"2024-01-{i % 28 + 1:02d}" for i in range(n_draws)],
+            **{f'D{i + 1}': dezenas[:, i] for i in range(6)},
+            'T1': trevos[:, 0],
+            'T2': trevos[:, 1],
+        })
+
+    @pytest.fixture
+    def tickets(self):
+        """Bilhetes sintéticos gerados com seed fixa."""
+        rng = np.random.default_rng(123)
+        return [
+            (
+                tuple(int(d) for d in np.sort(rng.choice(np.arange(1, 51), 6, replace=False))),
+                tuple(int(t) for t in np.sort(rng.choice(np.arange(1, 7), 2, replace=False))),
+            )
+            for _ in range(40)
+        ]
+
+    def _assert_same_results(self, tickets, historical_data):
+        expected = run_backtest_parallel(tickets, historical_data, num_workers=1, batch_size=len(tickets))
+        results = run_backtest_numba(tickets, historical_data)
+
+        assert len(results) == len(expected)
+        for result, reference in zip(results, expected):
+            assert result.keys() == reference.keys()
+            for field in ('ticket_id', 'dezenas', 'trevos', 'total_hits_dezenas', 'total_hits_trevos',
+                          'max_hits_dezenas', 'max_hits_trevos', 'winning_draws'):
+                assert result[field] == reference[field], field
+            assert dict(result['hit_distribution_dezenas']) == dict(reference['hit_distribution_dezenas'])
+            assert dict(result['hit_distribution_trevos']) == dict(reference['hit_distribution_trevos'])
+            assert result['avg_hits_dezenas'] == pytest.approx(reference['avg_hits_dezenas'])
+            assert result['avg_hits_trevos'] == pytest.approx(reference['avg_hits_trevos'])
+            assert result['score'] == pytest.approx(reference['score'])
+
+    @pytest.mark.skipif(not backtest_numba.NUMBA_AVAILABLE, reason="numba não instalado")
+    def test_numba_kernel_matches_parallel(self, tickets, historical_data):
+        """Testa a paridade usando o kernel Numba."""
+        self._assert_same_results(tickets, historical_data)
+
+    def test_numpy_fallback_matches_parallel(self, tickets, historical_data, monkeypatch):
+        """Testa a paridade usando o fallback NumPy (sem Numba)."""
+        monkeypatch.setattr(backtest_numba, "NUMBA_AVAILABLE", False)
+        self._assert_same_results(tickets, historical_data)
+
+    def test_empty_tickets(self, historical_data):
+        """Testa se lista vazia de bilhetes retorna lista vazia."""
+        assert run_backtest_numba([], historical_data) == []
@@ -0,0 +1,58 @@
+"""Testes de exportação de bilhetes em formatos colunares (Parquet/Feather)."""
+
+import pytest
+import polars as pl
+from pathlib import Path
+
+# Adicionar src ao path
+import sys
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from generate.export import EXPORT_COLUMNS, export_feather, export_parquet
+
+
+class TestExportColumnar:
+    """Testes de ida e volta de export_parquet e export_feather."""
+
+    @pytest.fixture
+    def tickets(self):
+        """Bilhetes de exemplo, incluindo os limites de dezenas e trevos."""
+        return [
+            ((5, 10, 15, 20, 25, 30), (2, 5)),
+            ((1, 6, 11, 16, 21, 26), (1, 3)),
+            ((45, 46, 47, 48, 49, 50), (4, 6)),
+        ]
+
+    @pytest.mark.parametrize("export, read, suffix", [
+        (export_parquet, pl.read_parquet, "parquet"),
+        (export_feather, pl.read_ipc, "feather"),
+    ])
+    def test_round_trip(self, tmp_path, tickets, export, read, suffix):
+        """Testa se o arquivo relido tem as mesmas colunas, tipos e linhas."""
+        path = tmp_path / "sub" / f"jogos.{suffix}"
+
+        export(tickets, str(path))
+
+        assert path.exists()
+        df = read(path)
+
+        assert df.columns == EXPORT_COLUMNS
+        assert df.dtypes == [pl.UInt8] * len(EXPORT_COLUMNS)
+        assert df.rows() == [(*dezenas, *trevos) for dezenas, trevos in tickets]
+
+    @pytest.mark.parametrize("export", [export_parquet, export_feather])
+    def test_empty_tickets(self, tmp_path, export):
+        """Testa se lista vazia é rejeitada sem criar arquivo."""
+        path = tmp_path / "jogos.out"
+
+        with pytest.raises(ValueError):
+            export([], str(path))
+
+        assert not path.exists()
+
+    @pytest.mark.parametrize("export", [export_parquet, export_feather])
+    def test_invalid_ticket(self, tmp_path, export):
+        """Testa se bilhete fora do range gera ValueError."""
+        with pytest.raises(ValueError):
+            export([((1, 2, 3, 4, 5, 51), (1, 2))], str(tmp_path / "jogos.out"))
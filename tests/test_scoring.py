@@ -0,0 +1,80 @@
+"""Testes para o aprendizado de pesos (learn_weights_ridge)."""
+
+import pytest
+import numpy as np
+import polars as pl
+from pathlib import Path
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+
+# Mesmo nome de módulo usado pela CLI (src.models...): o cache em disco do
+# kernel Numba guarda o nome do módulo que o compilou
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.models import scoring, scoring_numba
+
+FEATURE_COLS = ['freq_total', 'roll10', 'roll25', 'last_seen', 'momentum5']
+
+DEFAULT_WEIGHTS = {
+    'freq_total': 0.3,
+    'roll10': 0.25,
+    'roll25': 0.2,
+    'last_seen': -0.15,
+    'momentum5': 0.2
+}
+
+
+@pytest.fixture
+def features():
+    """Features sintéticas com y_next, geradas com seed fixa."""
+    rng = np.random.default_rng(42)
+    n = 500
+    return pl.DataFrame({
+        'freq_total': rng.integers(0, 60, n),
+        'roll10': rng.integers(0, 4, n),
+        'roll25': rng.integers(0, 8, n),
+        'last_seen': rng.integers(-30, 30, n),
+        'momentum5': rng.random(n),
+        'y_next': rng.random(n) < 0.12,
+    })
+
+
+@pytest.mark.parametrize("learn_weights_ridge", [
+    scoring.learn_weights_ridge,
+    scoring_numba.learn_weights_ridge,
+])
+class TestLearnWeightsRidge:
+    """Testes do retorno (model, scaler, weights, r2_train)."""
+
+    def test_returns_four_tuple(self, learn_weights_ridge, features):
+        """Testa se o retorno tem modelo, scaler, pesos blended e R²."""
+        result = learn_weights_ridge(features)
+
+        assert len(result) == 4
+        model, scaler, weights, r2_train = result
+
+        assert isinstance(model, Ridge)
+        assert isinstance(scaler, StandardScaler)
+        assert list(weights) == FEATURE_COLS
+        assert isinstance(r2_train, float)
+
+        # Pesos = 70% coeficientes do modelo + 30% default
+        for feature, coef in zip(FEATURE_COLS, model.coef_):
+            assert weights[feature] == pytest.approx(0.7 * coef + 0.3 * DEFAULT_WEIGHTS[feature])
+
+        # R² reportado é o do modelo nos dados de treino
+        X = scaler.transform(features.select(FEATURE_COLS).to_numpy())
+        y = features.get_column('y_next').cast(pl.Int64).to_numpy()
+        assert r2_train == pytest.approx(model.score(X, y))
+
+    def test_empty_training_fallback(self, learn_weights_ridge, features):
+        """Testa se sem y_next válido retorna pesos default e R² 0.0."""
+        no_target = features.with_columns(pl.lit(None, dtype=pl.Boolean).alias('y_next'))
+
+        model, scaler, weights, r2_train = learn_weights_ridge(no_target)
+
+        assert isinstance(model, Ridge)
+        assert isinstance(scaler, StandardScaler)
+        assert weights == DEFAULT_WEIGHTS
+        assert r2_train == 0.0